@@ -0,0 +1,71 @@
+"""
+Microbenchmark do hit-test de anotações da timeline: varredura linear reversa
+(implementação antiga de _get_annotation_at) vs. AnnotationIndex.
+Cada tamanho roda também com uma anotação que cobre a sessão inteira (o caso que
+fazia uma janela limitada pela maior duração varrer todas as anotações).
+
+Uso: python benchmarks/bench_annotation_hit_test.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.annotation_index import AnnotationIndex
+
+
+def linear_hit(annotations, t):
+    for i in range(len(annotations) - 1, -1, -1):
+        ann = annotations[i]
+        start = ann.get('time', 0)
+        if start <= t <= start + ann.get('duration', 3.0):
+            return ann
+    return None
+
+
+def make_annotations(n, seconds_per_tag=4.0, long_tag=False):
+    total = n * seconds_per_tag
+    annotations = [{'time': random.uniform(0, total), 'duration': random.uniform(0.5, 3.0)} for _ in range(n)]
+    if long_tag:
+        annotations.insert(0, {'time': 0.0, 'duration': total}) # Por baixo de todas
+    return annotations
+
+
+def per_call_us(fn, queries):
+    start = time.perf_counter()
+    for t in queries:
+        fn(t)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main():
+    random.seed(1)
+    print(f"{'anotações':>10} {'longa':>6} {'linear (us)':>12} {'índice (us)':>12} {'update (us)':>12}")
+    for n, long_tag in [(n, long_tag) for n in (100, 1000, 10000, 50000) for long_tag in (False, True)]:
+        annotations = make_annotations(n, long_tag=long_tag)
+        index = AnnotationIndex(annotations)
+        total = n * 4.0
+        queries = [random.uniform(0, total) for _ in range(2000)]
+
+        for t in queries[:200]:
+            assert linear_hit(annotations, t) is index.at(t)
+            assert index.overlapping(t, t + 5.0) == [ann for ann in annotations
+                                                     if ann['time'] <= t + 5.0 and ann['time'] + ann['duration'] >= t]
+
+        linear = per_call_us(lambda t: linear_hit(annotations, t), queries[:200])
+        indexed = per_call_us(index.at, queries)
+
+        # Resize incremental: move uma anotação e reposiciona no índice
+        def resize(t):
+            ann = annotations[-1 - int(t) % n] # Nunca a anotação longa
+            ann['time'] = max(0.0, ann['time'] + random.uniform(-0.5, 0.5))
+            index.update(ann)
+        update = per_call_us(resize, queries)
+
+        print(f"{n:>10} {'sim' if long_tag else 'não':>6} {linear:>12.1f} {indexed:>12.2f} {update:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Benchmark de seek exato (OpenCV) antes e depois do índice de keyframes.
+Para cada padrão de acesso, lê os mesmos quadros-alvo de dois jeitos:
+  - antes: cap.set(CAP_PROP_POS_FRAMES, alvo) + read() a cada quadro;
+  - depois: seek_exact() com o KeyframeIndex (decodifica para frente quando sai
+    mais barato que o seek) + read().
+Os quadros das duas leituras são comparados (devem ser idênticos). Também mede a
+montagem do índice (varredura raw), a leitura do sidecar e o tamanho dele.
+Sem vídeos na linha de comando, gera um clipe sintético (mp4v) num diretório temporário.
+
+Uso:
+  python benchmarks/bench_seek.py
+  python benchmarks/bench_seek.py video1.mp4 video2.mp4 --targets 200 -o resultado.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import cv2
+import numpy as np
+
+from src.core.keyframe_index import build_index, load_or_build_index, index_file, seek_exact
+
+SYNTHETIC_SIZE = (1280, 720)
+SYNTHETIC_FRAMES = 1800
+SYNTHETIC_FPS = 30
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def synthetic_video(directory):
+    path = os.path.join(directory, "sintetico.mp4")
+    w, h = SYNTHETIC_SIZE
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), SYNTHETIC_FPS, (w, h))
+    noise = np.random.default_rng(0).integers(0, 255, (h, w, 3), np.uint8)
+    for i in range(SYNTHETIC_FRAMES):
+        writer.write(np.roll(noise, i * 4, axis=1)) # Conteúdo diferente a cada quadro
+    writer.release()
+    return path
+
+
+def access_patterns(frame_count, fps, count, seed=1):
+    """Quadros-alvo de cada padrão (navegação na timeline, thumbnails, quadro a quadro)."""
+    random.seed(seed)
+    middle = frame_count // 2
+    half_second = max(1, round(fps / 2))
+    return {
+        'aleatorio': [random.randrange(frame_count) for _ in range(count)],
+        'passo_0.5s': list(range(0, frame_count, half_second))[:count],
+        'passo_10_quadros': list(range(0, frame_count, 10))[:count],
+        'recuo_5_quadros': [max(0, middle - 5 * i) for i in range(count)],
+    }
+
+
+def read_direct(path, targets):
+    cap = cv2.VideoCapture(path)
+    frames, samples = [], []
+    for target in targets:
+        start = time.perf_counter()
+        cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+        ok, frame = cap.read()
+        samples.append((time.perf_counter() - start) * 1000)
+        frames.append(frame if ok else None)
+    cap.release()
+    return frames, samples, len(targets)
+
+
+def read_indexed(path, targets, index):
+    cap = cv2.VideoCapture(path)
+    next_frame, seeks = 0, 0
+    frames, samples = [], []
+    for target in targets:
+        start = time.perf_counter()
+        seeks += seek_exact(cap, target, next_frame, index)
+        ok, frame = cap.read()
+        next_frame = target + 1 if ok else None
+        samples.append((time.perf_counter() - start) * 1000)
+        frames.append(frame if ok else None)
+    cap.release()
+    return frames, samples, seeks
+
+
+def summary(samples, seeks):
+    return {'median_ms': statistics.median(samples), 'mean_ms': statistics.fmean(samples),
+            'max_ms': max(samples), 'seeks': seeks}
+
+
+def run_video(path, count, index_dir):
+    start = time.perf_counter()
+    index = build_index(path)
+    build_ms = (time.perf_counter() - start) * 1000
+    if index is None:
+        print(f"Backend sem modo raw: índice indisponível para {path}")
+        return None
+
+    load_or_build_index(path, index_dir) # Grava o sidecar
+    start = time.perf_counter()
+    index = load_or_build_index(path, index_dir)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    result = {
+        'video': os.path.basename(path),
+        'frames': index.frame_count,
+        'keyframes': len(index.keyframes),
+        'gop_seconds': index.gop_seconds(),
+        'index_build_ms': build_ms,
+        'index_load_ms': load_ms,
+        'index_bytes': os.path.getsize(index_file(path, index_dir)),
+        'patterns': {},
+    }
+    for name, targets in access_patterns(index.frame_count, index.fps, count).items():
+        before_frames, before, before_seeks = read_direct(path, targets)
+        after_frames, after, after_seeks = read_indexed(path, targets, index)
+        mismatches = sum(1 for a, b in zip(before_frames, after_frames)
+                         if a is None or b is None or not np.array_equal(a, b))
+        result['patterns'][name] = {
+            'targets': len(targets),
+            'antes': summary(before, before_seeks),
+            'depois': summary(after, after_seeks),
+            'quadros_diferentes': mismatches,
+        }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("videos", nargs="*")
+    parser.add_argument("--targets", type=int, default=100)
+    parser.add_argument("-o", "--output", default="bench_seek.json")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        videos = args.videos or [synthetic_video(tmp)]
+        report = {
+            'commit': git_commit(),
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'python': platform.python_version(),
+            'opencv': cv2.__version__,
+            'videos': [],
+        }
+
+        print(f"{'vídeo':<20} {'padrão':<18} {'antes (ms)':>11} {'depois (ms)':>12} "
+              f"{'seeks antes':>12} {'seeks depois':>13} {'difs':>5}")
+        for path in videos:
+            result = run_video(path, args.targets, os.path.join(tmp, "keyframes"))
+            if result is None: continue
+            report['videos'].append(result)
+            for name, r in result['patterns'].items():
+                print(f"{result['video'][:20]:<20} {name:<18} {r['antes']['median_ms']:>11.2f} "
+                      f"{r['depois']['median_ms']:>12.2f} {r['antes']['seeks']:>12} "
+                      f"{r['depois']['seeks']:>13} {r['quadros_diferentes']:>5}")
+            print(f"{'':<20} índice: {result['keyframes']} keyframes / {result['frames']} quadros, "
+                  f"varredura {result['index_build_ms']:.0f} ms, leitura {result['index_load_ms']:.1f} ms, "
+                  f"{result['index_bytes'] / 1024:.1f} KB")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Resultados salvos em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
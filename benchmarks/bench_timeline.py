@@ -0,0 +1,189 @@
+"""
+Benchmark da TimelineWidget renderizada fora da tela (QT_QPA_PLATFORM=offscreen).
+Monta projetos sintéticos (N clipes, M anotações, K thumbnails), desenha a timeline
+num QImage e mede:
+  - paint: repintura completa com os tiles descartados (custo de _paint_static),
+    com os tiles em cache e na visão geral (projeto inteiro na tela);
+  - hover: _get_annotation_at em posições aleatórias da faixa de anotações;
+  - seek: _process_seek (x na tela -> clipe + tempo local).
+Os resultados vão para um JSON (com o commit atual) para comparar entre commits.
+
+Uso:
+  python benchmarks/bench_timeline.py
+  python benchmarks/bench_timeline.py --clips 200 --annotations 50000 --thumbnails 20000 -o resultado.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+import PySide6
+from PySide6.QtCore import QBuffer, QIODevice, QPoint
+from PySide6.QtGui import QColor, QImage, QRegion
+from PySide6.QtWidgets import QApplication
+
+from src.config import SKILLS, RULER_HEIGHT, ANNOTATION_TRACK_HEIGHT, THUMBNAIL_HEIGHT
+from src.ui.components.timeline_widget import TimelineWidget
+from src.ui import skill_styles
+
+# (clipes, anotações, thumbnails) usados quando nenhum tamanho é passado na linha de comando
+DEFAULT_SCENARIOS = ((10, 500, 1000), (60, 5000, 5000), (200, 50000, 20000))
+CLIP_SECONDS = 60.0
+VIEW_WIDTH, VIEW_HEIGHT = 1280, RULER_HEIGHT + ANNOTATION_TRACK_HEIGHT + THUMBNAIL_HEIGHT + 20
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def jpeg_thumbnail():
+    image = QImage(THUMBNAIL_HEIGHT * 16 // 9, THUMBNAIL_HEIGHT, QImage.Format_RGB32)
+    image.fill(QColor("#3a6ea5"))
+    buffer = QBuffer()
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, "JPEG", 80)
+    return bytes(buffer.data())
+
+
+def build_project(timeline, clips, annotations, thumbnails, seed=1):
+    random.seed(seed)
+    videos = [{'nome': f"video_{i}.mp4", 'caminho': f"/bench/video_{i}.mp4", 'duracao': CLIP_SECONDS}
+              for i in range(clips)]
+    total = clips * CLIP_SECONDS
+    anns = []
+    for _ in range(annotations):
+        skill = random.randrange(len(SKILLS))
+        color, icon_path = skill_styles.skill_style(skill)
+        anns.append({'time': random.uniform(0, total - 3.0), 'duration': random.uniform(0.5, 3.0),
+                     'text': f"{skill + 1}. {SKILLS[skill]}", 'color': color, 'icon_path': icon_path,
+                     'skill_index': skill})
+    timeline.set_data(videos, anns)
+
+    # Thumbnails no nível do zoom padrão, espalhados pelos clipes (bytes JPEG: decodificados sob demanda)
+    timeline._update_zoom()
+    level = timeline.pick_thumbnail_level(timeline.pixels_per_second)
+    per_clip = max(1, int(CLIP_SECONDS // level))
+    data = jpeg_thumbnail()
+    for k in range(min(thumbnails, clips * per_clip)):
+        clip, index = divmod(k, per_clip)
+        timeline.thumbnail_store.put(videos[clip]['caminho'], level, index, data)
+    return total
+
+
+def timed_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {'median_ms': statistics.median(samples), 'min_ms': min(samples), 'max_ms': max(samples)}
+
+
+def per_call_us(fn, args):
+    start = time.perf_counter()
+    for a in args:
+        fn(*a)
+    return (time.perf_counter() - start) / len(args) * 1e6
+
+
+def run_scenario(app, clips, annotations, thumbnails, repeat):
+    timeline = TimelineWidget()
+    timeline.resize(VIEW_WIDTH, VIEW_HEIGHT)
+    timeline.seek_requested.connect(lambda *args: None)
+    total = build_project(timeline, clips, annotations, thumbnails)
+    timeline.resize(VIEW_WIDTH, max(VIEW_HEIGHT, timeline.minimumHeight())) # Linhas extras de rótulos
+    image = QImage(timeline.size(), QImage.Format_ARGB32_Premultiplied)
+    region = QRegion(timeline.rect())
+
+    def paint():
+        timeline.render(image, QPoint(), region)
+
+    def paint_cold():
+        timeline.invalidate_static()
+        paint()
+
+    results = {}
+    # Meio do projeto no zoom padrão
+    timeline.set_scroll_x(timeline.scroll_bar.maximum() // 2)
+    paint_cold()
+    app.processEvents()
+    results['paint_cold'] = timed_ms(paint_cold, repeat)
+    results['paint_cached'] = timed_ms(paint, repeat)
+
+    # Visão geral: projeto inteiro na tela
+    timeline.zoom_by(1e-6, 0)
+    timeline.set_scroll_x(0)
+    paint_cold()
+    results['paint_overview'] = timed_ms(paint_cold, repeat)
+    timeline.zoom_pixels_per_second = None
+    timeline._update_zoom()
+
+    # Hover / seek em posições aleatórias do conteúdo (x do conteúdo, como após _content_x)
+    content_w = total * timeline.pixels_per_second
+    queries = [(random.uniform(0, content_w), random.uniform(RULER_HEIGHT, timeline.video_track_y()))
+               for _ in range(5000)]
+    results['hit_test_us'] = per_call_us(timeline._get_annotation_at, queries)
+    results['seek_mapping_us'] = per_call_us(timeline._process_seek, [(x, False) for x, _ in queries])
+
+    timeline.deleteLater()
+    return {'clips': clips, 'annotations': annotations, 'thumbnails': thumbnails,
+            'pixels_per_second': timeline.pixels_per_second, 'results': results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clips", type=int)
+    parser.add_argument("--annotations", type=int)
+    parser.add_argument("--thumbnails", type=int)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("-o", "--output", default="bench_timeline.json")
+    args = parser.parse_args()
+
+    if args.clips or args.annotations or args.thumbnails:
+        scenarios = [(args.clips or 10, args.annotations or 0, args.thumbnails or 0)]
+    else:
+        scenarios = DEFAULT_SCENARIOS
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    report = {
+        'commit': git_commit(),
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'python': platform.python_version(),
+        'pyside': PySide6.__version__,
+        'platform': os.environ.get("QT_QPA_PLATFORM"),
+        'viewport': [VIEW_WIDTH, VIEW_HEIGHT],
+        'scenarios': [],
+    }
+
+    print(f"{'clipes':>7} {'anot.':>7} {'thumbs':>7} {'frio (ms)':>10} {'cache (ms)':>11} "
+          f"{'geral (ms)':>11} {'hover (us)':>11} {'seek (us)':>10}")
+    for clips, annotations, thumbnails in scenarios:
+        scenario = run_scenario(app, clips, annotations, thumbnails, args.repeat)
+        report['scenarios'].append(scenario)
+        r = scenario['results']
+        print(f"{clips:>7} {annotations:>7} {thumbnails:>7} {r['paint_cold']['median_ms']:>10.2f} "
+              f"{r['paint_cached']['median_ms']:>11.2f} {r['paint_overview']['median_ms']:>11.2f} "
+              f"{r['hit_test_us']:>11.2f} {r['seek_mapping_us']:>10.2f}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Resultados salvos em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,8 +19,80 @@ CLIP_DIVIDER_WIDTH = 2
 RULER_TICK_HEIGHT = 5
 THUMBNAIL_HEIGHT = 50
 ANNOTATION_TRACK_HEIGHT = 50
+ANNOTATION_LANE_HEIGHT = 30    # Altura de cada linha quando rótulos sobrepostos ocupam várias linhas
+ANNOTATION_MAX_VISIBLE_LANES = 4 # Linhas além desta são agrupadas na última (contorno tracejado e "+N" no cabeçalho)
 RULER_HEIGHT = 20
-THUMBNAIL_INTERVAL_SECONDS = 3
+# Régua adaptativa: o passo dos tiques é escolhido pelo zoom (no máximo ~RULER_MAX_TICKS na tela)
+RULER_TICK_STEPS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 15, 30, 60, 120, 300, 600, 900, 1800, 3600)
+RULER_MAX_TICKS = 100
+RULER_MIN_TICK_SPACING = 8     # px entre tiques
+RULER_MIN_LABEL_SPACING = 60   # px entre rótulos
+# Zoom da timeline (Ctrl+roda / pinça): do projeto inteiro na tela até o nível de quadro
+TIMELINE_DEFAULT_VIEWPORT_SECONDS = 30.0
+TIMELINE_MAX_PIXELS_PER_SECOND = 600.0
+TIMELINE_ZOOM_STEP = 1.25      # Fator por "clique" da roda
+TIMELINE_TILE_WIDTH = 512       # Largura (px) dos tiles em cache do conteúdo estático da timeline
+TIMELINE_TILE_CACHE_SIZE = 48   # Tiles mantidos em memória (LRU)
+# Nível de detalhe dos rótulos: com o zoom afastado (rótulo típico mais estreito que
+# ANNOTATION_DETAIL_MIN_WIDTH) a faixa mostra barras de densidade por habilidade
+ANNOTATION_DETAIL_MIN_WIDTH = 40  # px para desenhar ícone, separador e texto
+ANNOTATION_DENSITY_BIN_PX = 4     # Largura aproximada (px) de cada faixa de densidade
+
+# Pirâmide de Thumbnails (segundos entre thumbnails em cada nível, do mais fino ao mais grosso)
+# O nível é escolhido pelo zoom atual e gerado sob demanda.
+THUMBNAIL_LEVELS = (1, 3, 12, 60)
+THUMBNAIL_MIN_SCREEN_WIDTH = 60  # Largura mínima (px) de um thumbnail na tela
+
+# Extração de Thumbnails (seek vs. decodificação sequencial)
+THUMBNAIL_DEFAULT_GOP_SECONDS = 2.0   # Usado quando não dá para medir o GOP do arquivo
+THUMBNAIL_GOP_PROBE_PACKETS = 600     # Pacotes lidos (sem decodificar) para estimar o GOP
+THUMBNAIL_SEEK_COST_FRAMES = 8        # Custo fixo de um seek, em quadros decodificados equivalentes
+
+# Prévia rápida: primeiro passe com o quadro mais barato perto de cada amostra (logo
+# após o keyframe mais próximo: ~17 quadros decodificados por thumbnail, qualquer que
+# seja o GOP), depois um segundo passe, em segundo plano, com as posições exatas
+THUMBNAIL_FAST_PREVIEW = True
+THUMBNAIL_REFINE_PREVIEW = True
+
+# Cache de Thumbnails em disco
+THUMBNAIL_CACHE_MAX_BYTES = 512 * 1024 * 1024  # Limite total dos thumbnails gravados (LRU acima disso)
+THUMBNAIL_CACHE_JPEG_QUALITY = 85  # Só para QImages; os JPEGs do worker são gravados como estão
+
+# Agendamento de Thumbnails (prioridade pela área visível da timeline)
+THUMBNAIL_JOB_SECONDS = 30  # Cada vídeo é dividido em jobs cobrindo este trecho de tempo
+
+# Geração paralela de Thumbnails (pool de processos)
+THUMBNAIL_PROCESS_WORKERS = 0  # 0 = automático (núcleos - 1); 1 = sem pool, decodifica na thread
+THUMBNAIL_JPEG_QUALITY = 80    # Qualidade dos buffers JPEG devolvidos pelos processos
+
+# Memória dos Thumbnails na timeline
+THUMBNAIL_MEMORY_BUDGET_BYTES = 64 * 1024 * 1024  # Pixmaps decodificados (LRU); o resto fica em JPEG
+
+# Entrega de Thumbnails à UI (em lotes)
+THUMBNAIL_BATCH_INTERVAL_MS = 50  # Worker agrupa os thumbnails gerados neste intervalo num único sinal
+THUMBNAIL_FLUSH_INTERVAL_MS = 33  # Timeline aplica os lotes no máximo ~30x por segundo
+
+# Prévia ao passar o mouse na faixa de vídeo (sem tocar no player)
+SCRUB_PREVIEW_LEVEL = 0.5    # Um quadro a cada 0,5 s, só dos clipes sob o mouse (o atual na frente da fila)
+SCRUB_PREVIEW_HEIGHT = 72    # Altura (px) dos quadros da prévia (baixa resolução)
+
+# Agulha durante a reprodução: extrapolada do relógio da mídia a cada quadro da tela
+PLAYHEAD_FALLBACK_REFRESH_HZ = 60   # Quando a tela não informa a taxa de atualização
+PLAYHEAD_MAX_EXTRAPOLATION = 0.5    # s além da última posição do player (evita fugir se a mídia travar)
+PLAYHEAD_RESYNC_TOLERANCE = 0.25    # s: recuo menor que isso não puxa a agulha para trás (jitter)
+
+# Player com dois decks: o reserva pré-carrega o clipe vizinho ou o clipe sob o mouse na timeline
+PLAYER_HOVER_PRELOAD_DELAY_MS = 200 # Mouse parado sobre um clipe por este tempo antes de pré-carregar
+# Carregamento a frio: o loading sai no primeiro quadro decodificado (sem atraso fixo)
+LOAD_SEEK_TOLERANCE_MS = 100 # Quadro a esta distância do alvo conta como seek concluído
+LOAD_SEEK_TIMEOUT_MS = 500   # Depois do primeiro quadro, conclui mesmo sem confirmar a posição
+LOAD_FIRST_FRAME_TIMEOUT_MS = 2000 # Depois da abertura, conclui mesmo sem nenhum quadro (só áudio, stream quebrado)
+
+# Navegação quadro a quadro: janela de quadros decodificados (OpenCV) em volta da agulha
+FRAME_BUFFER_BEHIND = 30        # Quadros mantidos antes da agulha
+FRAME_BUFFER_AHEAD = 30         # Quadros mantidos depois da agulha
+FRAME_BUFFER_MAX_HEIGHT = 720   # Quadros maiores são reduzidos (61 quadros 720p ~ 170 MB)
+FRAME_BUFFER_REFILL_BLOCK = 10  # Para trás, reabastece em blocos (um seek por bloco)
 
 # Dados
 SKILLS = [
@@ -29,6 +101,14 @@ SKILLS = [
     "Pegar", "Chutar", "Arremesso por baixo", "Arremesso por cima"
 ]
 
+# Ícones das habilidades (mesma ordem de SKILLS), em assets/icones_habilidades
+SKILL_ICON_FILES = [
+    "1-correr.png", "2-galopar.png", "3-saltar.png", "4-saltitar.png",
+    "5-saltar-horizontal.png", "6-deslizar.png", "7-rebater2maos.png", 
+    "8-rebater1mao.png", "9-quicar.png", "10-pegar.png", "11-chutar.png",
+    "13-lançar-por-baixo.png", "12-arremessar-por-cima.png"
+]
+
 # Atalhos de Teclado
 SHORTCUTS = {
     "PLAY_PAUSE": "Space",
@@ -43,7 +123,9 @@ SHORTCUTS = {
     "SKIP_BACKWARD": "Left",
     "NEXT_TRIAL": "Shift+Right",
     "PREV_TRIAL": "Shift+Left",
-    "LOCK_TAGS": "Ctrl+L"
+    "LOCK_TAGS": "Ctrl+L",
+    "PREV_FRAME": ",",
+    "NEXT_FRAME": "."
 }
 
 # Cores das Habilidades (Exemplo)
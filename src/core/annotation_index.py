@@ -0,0 +1,353 @@
+import heapq
+import math
+import random
+
+
+class _Node:
+    __slots__ = ("key", "value", "end", "priority", "left", "right", "max_end", "size")
+
+    def __init__(self, key, value, end):
+        self.key = key
+        self.value = value
+        self.end = end
+        self.priority = random.random()
+        self.left = None
+        self.right = None
+        self.max_end = end
+        self.size = 1
+
+
+def _pull(node):
+    # Recalcula os agregados da subárvore (maior fim e tamanho)
+    max_end, size = node.end, 1
+    left, right = node.left, node.right
+    if left is not None:
+        size += left.size
+        if left.max_end > max_end: max_end = left.max_end
+    if right is not None:
+        size += right.size
+        if right.max_end > max_end: max_end = right.max_end
+    node.max_end, node.size = max_end, size
+
+
+def _split(node, key):
+    """(chaves < key, chaves >= key)"""
+    if node is None:
+        return None, None
+    if node.key < key:
+        left, right = _split(node.right, key)
+        node.right = left
+        _pull(node)
+        return node, right
+    left, right = _split(node.left, key)
+    node.left = right
+    _pull(node)
+    return left, node
+
+
+def _merge(a, b):
+    # Todas as chaves de `a` são menores que as de `b`
+    if a is None: return b
+    if b is None: return a
+    if a.priority > b.priority:
+        a.right = _merge(a.right, b)
+        _pull(a)
+        return a
+    b.left = _merge(a, b.left)
+    _pull(b)
+    return b
+
+
+def _remove(node, key):
+    if node is None:
+        return None
+    if node.key == key:
+        return _merge(node.left, node.right)
+    if key < node.key:
+        node.left = _remove(node.left, key)
+    else:
+        node.right = _remove(node.right, key)
+    _pull(node)
+    return node
+
+
+class _IntervalTreap:
+    """
+    Árvore de busca (treap, prioridades aleatórias) ordenada pela chave, com o maior
+    fim e o tamanho de cada subárvore. Inserir/remover custa O(log n) esperado; a busca
+    por sobreposição só desce em subárvores cujo maior fim alcança o intervalo pedido,
+    então uma anotação longa não obriga a olhar as outras.
+    """
+
+    def __init__(self):
+        self.root = None
+
+    def __len__(self):
+        return self.root.size if self.root is not None else 0
+
+    def build(self, items):
+        """Monta a árvore em O(n) a partir de (chave, valor, fim) já ordenados pela chave."""
+        stack = [] # Ramo direito (árvore cartesiana pelas prioridades)
+        for key, value, end in items:
+            node = _Node(key, value, end)
+            last = None
+            while stack and stack[-1].priority < node.priority:
+                last = stack.pop()
+            node.left = last
+            if stack:
+                stack[-1].right = node
+            stack.append(node)
+        self.root = stack[0] if stack else None
+
+        # Agregados de baixo para cima (pós-ordem iterativa)
+        order, pending = [], [self.root] if self.root is not None else []
+        while pending:
+            node = pending.pop()
+            order.append(node)
+            if node.left is not None: pending.append(node.left)
+            if node.right is not None: pending.append(node.right)
+        for node in reversed(order):
+            _pull(node)
+
+    def insert(self, key, value, end):
+        left, right = _split(self.root, key)
+        self.root = _merge(_merge(left, _Node(key, value, end)), right)
+
+    def remove(self, key):
+        self.root = _remove(self.root, key)
+
+    def overlapping(self, start, end):
+        """(chave, valor) com chave[0] <= end e fim >= start, em ordem de chave."""
+        found = []
+        self._collect(self.root, start, end, found)
+        return found
+
+    def _collect(self, node, start, end, found):
+        if node is None or node.max_end < start:
+            return
+        self._collect(node.left, start, end, found)
+        if node.key[0] > end:
+            return # Daqui para a direita todos começam depois de `end`
+        if node.end >= start:
+            found.append((node.key, node.value))
+        self._collect(node.right, start, end, found)
+
+    def kth(self, k):
+        """Chave na posição k (0 = menor)."""
+        node = self.root
+        while node is not None:
+            left_size = node.left.size if node.left is not None else 0
+            if k < left_size:
+                node = node.left
+            elif k == left_size:
+                return node.key
+            else:
+                k -= left_size + 1
+                node = node.right
+        raise IndexError(k)
+
+    def values(self):
+        """Valores em ordem de chave."""
+        result, stack, node = [], [], self.root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            result.append(node.value)
+            node = node.right
+        return result
+
+
+class AnnotationIndex:
+    """
+    Índice de intervalos das anotações da timeline (dicts com 'time' e 'duration').
+    As anotações ficam numa árvore de intervalos (_IntervalTreap) ordenada pelo início,
+    com o maior fim de cada subárvore: "quem está em t" e "quem cruza [a, b]" custam
+    O(log n) mais as anotações encontradas, mesmo com rótulos muito longos.
+    Atualizado incrementalmente (add / update / remove, O(log n)). A ordem de inserção é a
+    ordem de desenho: em sobreposições, a mais recente fica por cima.
+    Para a visão afastada, guarda também a densidade por habilidade em faixas de
+    tempo (uma tabela por tamanho de faixa, refeita só depois de edições).
+    Cada anotação tem uma linha (lane) na faixa de rótulos: anotações que se sobrepõem
+    nunca dividem a linha. rebuild distribui todas numa varredura O(n log n) com o
+    mínimo de linhas; add/update só escolhem a linha da anotação editada.
+    """
+
+    def __init__(self, annotations=()):
+        self.rebuild(annotations)
+
+    def rebuild(self, annotations):
+        self._tree = _IntervalTreap()       # (início, seq) -> anotação, com o fim
+        self._durations = _IntervalTreap()  # (duração, seq): mediana por posição
+        self._state = {}      # id(anotação) -> (início, seq, duração) indexados
+        self._next_seq = 0
+        self._density = {}    # tamanho da faixa (s) -> {faixa: {habilidade: quantidade}}
+        self._lanes = {}      # id(anotação) -> linha
+        self._lane_usage = [] # anotações em cada linha
+
+        items, durations = [], []
+        for ann in annotations:
+            start, duration = self._interval(ann)
+            seq = self._next_seq
+            self._next_seq += 1
+            self._state[id(ann)] = (start, seq, duration)
+            items.append(((start, seq), ann, start + duration))
+            durations.append(((duration, seq), None, 0))
+
+        items.sort(key=lambda item: item[0])
+        durations.sort(key=lambda item: item[0])
+        self._tree.build(items)
+        self._durations.build(durations)
+        self._pack_lanes()
+
+    def __len__(self):
+        return len(self._state)
+
+    def __contains__(self, ann):
+        return id(ann) in self._state
+
+    def add(self, ann):
+        start, duration = self._interval(ann)
+        seq = self._next_seq
+        self._next_seq += 1
+        self._insert(ann, start, seq, duration)
+        self._take_lane(ann, self._free_lane(ann, start, duration))
+
+    def update(self, ann):
+        """Reposiciona a anotação depois de 'time'/'duration' mudarem (mantém a ordem de desenho)."""
+        state = self._state.get(id(ann))
+        if state is None:
+            self.add(ann)
+            return
+        start, duration = self._interval(ann)
+        if (start, duration) == (state[0], state[2]):
+            return
+        self._delete(ann, state)
+        self._insert(ann, start, state[1], duration)
+
+        # Continua na mesma linha enquanto não colidir com ninguém nela
+        lane = self._lanes[id(ann)]
+        if lane in self._lanes_taken(ann, start, duration):
+            self._release_lane(ann)
+            self._take_lane(ann, self._free_lane(ann, start, duration))
+
+    def remove(self, ann):
+        state = self._state.get(id(ann))
+        if state is not None:
+            self._delete(ann, state)
+            self._release_lane(ann)
+
+    def at(self, t, lane=None):
+        """Anotação de cima (a mais recente) que contém o instante t (na linha `lane`, se dada), ou None."""
+        best, best_seq = None, -1
+        for (_, seq), ann in self._tree.overlapping(t, t):
+            if seq > best_seq and (lane is None or self._lanes[id(ann)] == lane):
+                best, best_seq = ann, seq
+        return best
+
+    def lane_of(self, ann):
+        return self._lanes.get(id(ann), 0)
+
+    @property
+    def lane_count(self):
+        return len(self._lane_usage)
+
+    def typical_duration(self):
+        """Duração mediana (define se o zoom mostra rótulos ou a densidade)."""
+        if not len(self._durations):
+            return 0.0
+        return self._durations.kth(len(self._durations) // 2)[0]
+
+    def density(self, bin_seconds):
+        """
+        {faixa: {skill_index: quantidade}} com quantas anotações de cada habilidade
+        cobrem cada faixa de `bin_seconds` (faixa k = [k*bin, (k+1)*bin)). Só faixas ocupadas.
+        """
+        table = self._density.get(bin_seconds)
+        if table is not None:
+            return table
+
+        table = {}
+        for ann in self._tree.values():
+            start, _, duration = self._state[id(ann)]
+            skill = ann.get('skill_index', -1)
+            first = int(math.floor(start / bin_seconds))
+            last = max(first, int(math.ceil((start + duration) / bin_seconds)) - 1)
+            for k in range(first, last + 1):
+                counts = table.get(k)
+                if counts is None:
+                    counts = table[k] = {}
+                counts[skill] = counts.get(skill, 0) + 1
+        self._density[bin_seconds] = table
+        return table
+
+    def overlapping(self, start, end):
+        """Anotações que cruzam [start, end], na ordem de desenho."""
+        found = self._tree.overlapping(start, end)
+        found.sort(key=lambda item: item[0][1])
+        return [ann for _, ann in found]
+
+    # --- Internos ---
+
+    @staticmethod
+    def _interval(ann):
+        return ann.get('time', 0), ann.get('duration', 3.0)
+
+    def _pack_lanes(self):
+        # Varredura pelo início: a linha livre de menor número (heap), ou uma nova
+        self._lanes = {}
+        self._lane_usage = []
+        free = []    # linhas livres
+        active = []  # (fim, linha) das anotações em andamento
+        for ann in self._tree.values():
+            start, _, duration = self._state[id(ann)]
+            while active and active[0][0] <= start:
+                heapq.heappush(free, heapq.heappop(active)[1])
+            lane = heapq.heappop(free) if free else len(self._lane_usage)
+            self._take_lane(ann, lane)
+            heapq.heappush(active, (start + duration, lane))
+
+    def _lanes_taken(self, ann, start, duration):
+        """Linhas das outras anotações que se sobrepõem (estritamente) a [start, start + duration]."""
+        end = start + duration
+        taken = set()
+        for _, other in self._tree.overlapping(start, end):
+            if other is ann or id(other) not in self._lanes: continue
+            other_start, _, other_duration = self._state[id(other)]
+            if other_start < end and other_start + other_duration > start:
+                taken.add(self._lanes[id(other)])
+        return taken
+
+    def _free_lane(self, ann, start, duration):
+        taken = self._lanes_taken(ann, start, duration)
+        lane = 0
+        while lane in taken:
+            lane += 1
+        return lane
+
+    def _take_lane(self, ann, lane):
+        while len(self._lane_usage) <= lane:
+            self._lane_usage.append(0)
+        self._lane_usage[lane] += 1
+        self._lanes[id(ann)] = lane
+
+    def _release_lane(self, ann):
+        lane = self._lanes.pop(id(ann), None)
+        if lane is None: return
+        self._lane_usage[lane] -= 1
+        while self._lane_usage and self._lane_usage[-1] == 0:
+            self._lane_usage.pop()
+
+    def _insert(self, ann, start, seq, duration):
+        self._tree.insert((start, seq), ann, start + duration)
+        self._durations.insert((duration, seq), None, 0)
+        self._state[id(ann)] = (start, seq, duration)
+        self._density = {}
+
+    def _delete(self, ann, state):
+        start, seq, duration = state
+        self._tree.remove((start, seq))
+        self._durations.remove((duration, seq))
+        del self._state[id(ann)]
+        self._density = {}
@@ -0,0 +1,99 @@
+from bisect import bisect_right
+
+
+class ClipLayout:
+    """
+    Posição dos clipes no tempo global da timeline (soma das durações anteriores).
+    Guarda os inícios acumulados num array: offset de um clipe em O(1) e
+    "qual clipe está no tempo global t" por busca binária.
+    A lista de clipes é a do projeto (arquivosDeVideo); importação só acrescenta
+    os novos inícios, e remover/reordenar recalcula a partir do clipe afetado.
+    """
+
+    def __init__(self, clips=None):
+        self.clips = []
+        self._starts = [0.0] # Início de cada clipe + fim do último
+        if clips is not None:
+            self.set_clips(clips)
+
+    @staticmethod
+    def duration_of(clip):
+        return clip.get('duracao', 0) if isinstance(clip, dict) else clip.duration
+
+    def set_clips(self, clips):
+        """Usa `clips` como lista de clipes; se for a mesma lista, que só cresceu, estende."""
+        if clips is self.clips and len(clips) >= len(self):
+            self._extend_from(len(self))
+            return
+        self.clips = clips
+        self._starts = [0.0]
+        self._extend_from(0)
+
+    def sync(self):
+        """Acompanha a lista se ela mudou de tamanho por fora (ex.: vídeos importados)."""
+        if len(self) != len(self.clips):
+            self.set_clips(self.clips)
+            return True
+        return False
+
+    def extend(self, clips):
+        first = len(self)
+        self.clips.extend(clips)
+        self._extend_from(first)
+
+    def remove(self, index):
+        clip = self.clips.pop(index)
+        self._rebuild_from(index)
+        return clip
+
+    def move(self, src, dst):
+        clip = self.clips.pop(src)
+        self.clips.insert(dst, clip)
+        self._rebuild_from(min(src, dst))
+
+    def __len__(self):
+        return len(self._starts) - 1
+
+    @property
+    def total(self):
+        return self._starts[-1]
+
+    def offset(self, index):
+        return self._starts[index]
+
+    def duration(self, index):
+        return self._starts[index + 1] - self._starts[index]
+
+    def end(self, index):
+        return self._starts[index + 1]
+
+    def index_at(self, global_time):
+        """Índice do clipe com início <= t < fim, ou None (antes do início / depois do fim)."""
+        index = bisect_right(self._starts, global_time) - 1
+        if 0 <= index < len(self) and global_time < self._starts[index + 1]:
+            return index
+        return None
+
+    def bounds(self, global_time):
+        """(índice, início global, fim global) do clipe em global_time, ou None."""
+        index = self.index_at(global_time)
+        if index is None:
+            return None
+        return index, self._starts[index], self._starts[index + 1]
+
+    def index_range(self, start, end):
+        """(primeiro, último) índice dos clipes que cruzam [start, end]."""
+        last_index = len(self) - 1
+        first = min(max(0, bisect_right(self._starts, start) - 1), last_index)
+        last = min(max(0, bisect_right(self._starts, end) - 1), last_index)
+        return first, last
+
+    # --- Internos ---
+
+    def _rebuild_from(self, index):
+        del self._starts[index + 1:]
+        self._extend_from(index)
+
+    def _extend_from(self, index):
+        for clip in self.clips[index:]:
+            self._starts.append(self._starts[-1] + self.duration_of(clip))
@@ -0,0 +1,211 @@
+import hashlib
+import os
+
+import cv2
+import numpy as np
+
+from src.config import THUMBNAIL_SEEK_COST_FRAMES
+
+# O backend FFmpeg do OpenCV começa cada seek este número de quadros antes do alvo
+# (volta ao keyframe anterior a esse ponto e decodifica para frente até o alvo)
+OPENCV_SEEK_BACKOFF_FRAMES = 16
+INDEX_VERSION = 1
+
+
+def raw_scan_supported():
+    """O backend FFmpeg do OpenCV expõe pacotes sem decodificar e a flag de keyframe?"""
+    return hasattr(cv2, "CAP_PROP_LRF_HAS_KEY_FRAME")
+
+
+def _open_raw(path):
+    cap = cv2.VideoCapture(path, cv2.CAP_FFMPEG, [cv2.CAP_PROP_FORMAT, -1])
+    if not cap.isOpened():
+        return None
+    return cap
+
+
+def scan_keyframes(path, max_packets=None):
+    """
+    Lê os pacotes de vídeo sem decodificar (modo raw do FFmpeg) e devolve
+    (índices dos pacotes que são keyframes, total de pacotes lidos).
+    Custa apenas a leitura/demux do arquivo. Retorna None se o backend não suportar.
+    """
+    if not raw_scan_supported():
+        return None
+
+    cap = _open_raw(path)
+    if cap is None:
+        return None
+
+    keyframes = []
+    packet = 0
+    while (max_packets is None or packet < max_packets) and cap.grab():
+        if cap.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME):
+            keyframes.append(packet)
+        packet += 1
+    cap.release()
+    return keyframes, packet
+
+
+class KeyframeIndex:
+    """
+    Índice de um vídeo: PTS de cada quadro (ordem de exibição, µs) e os quadros que
+    são keyframes. Montado uma vez na importação (varredura raw, sem decodificar) e
+    gravado como arrays empacotados num arquivo ao lado do cache de thumbnails.
+    Os índices de quadro seguem a numeração do CAP_PROP_POS_FRAMES do OpenCV.
+    """
+
+    def __init__(self, pts_us, keyframes, fps):
+        self.pts_us = np.asarray(pts_us, dtype=np.int64)
+        self.keyframes = np.asarray(keyframes, dtype=np.int32)
+        self.fps = float(fps)
+
+    @property
+    def frame_count(self):
+        return len(self.pts_us)
+
+    def frame_at_time(self, seconds):
+        """Quadro em exibição no instante `seconds` (último PTS <= tempo)."""
+        if not self.frame_count: return 0
+        us = int(self.pts_us[0]) + int(round(seconds * 1e6))
+        frame = int(np.searchsorted(self.pts_us, us, side="right")) - 1
+        return min(max(0, frame), self.frame_count - 1)
+
+    def frame_time(self, frame):
+        """Instante (s, a partir do primeiro quadro) do quadro `frame`."""
+        return (int(self.pts_us[frame]) - int(self.pts_us[0])) / 1e6
+
+    def keyframe_before(self, frame):
+        """Keyframe que abre o GOP do quadro `frame`."""
+        pos = int(np.searchsorted(self.keyframes, frame, side="right")) - 1
+        return int(self.keyframes[pos]) if pos >= 0 else 0
+
+    def gop_seconds(self):
+        if len(self.keyframes) < 2:
+            return self.frame_count / self.fps if self.fps > 0 and self.frame_count else None
+        return float(np.diff(self.keyframes).mean()) / self.fps
+
+    def seek_cost(self, frame):
+        """Quadros decodificados por um cap.set(CAP_PROP_POS_FRAMES, frame) seguido de read()."""
+        start = self.keyframe_before(max(0, frame - OPENCV_SEEK_BACKOFF_FRAMES))
+        return frame - start + 1 + THUMBNAIL_SEEK_COST_FRAMES
+
+    def forward_grabs(self, target, next_frame):
+        """
+        Quantos grab() levam o decodificador de `next_frame` até `target` quando isso sai
+        mais barato que um seek; None quando o seek compensa (ou o alvo ficou para trás).
+        """
+        if next_frame is None or target < next_frame:
+            return None
+        grabs = target - next_frame
+        return grabs if grabs + 1 <= self.seek_cost(target) else None
+
+    # --- Sidecar ---
+
+    def save(self, file_path):
+        tmp_path = f"{file_path}.{os.getpid()}.tmp" # Processos do pool podem gravar o mesmo índice
+        with open(tmp_path, "wb") as f:
+            np.savez(f, version=np.int32(INDEX_VERSION), fps=np.float64(self.fps),
+                     pts_us=self.pts_us, keyframes=self.keyframes)
+        os.replace(tmp_path, file_path)
+
+    @classmethod
+    def load(cls, file_path):
+        """Índice gravado em `file_path`, ou None se não existir / for de outra versão."""
+        try:
+            with np.load(file_path) as data:
+                if int(data["version"]) != INDEX_VERSION:
+                    return None
+                return cls(data["pts_us"], data["keyframes"], float(data["fps"]))
+        except (OSError, KeyError, ValueError) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"Erro ao carregar índice de keyframes {file_path}: {e}")
+            return None
+
+
+def build_index(path):
+    """
+    Varre todos os pacotes (modo raw, sem decodificar) anotando PTS e keyframes.
+    Retorna um KeyframeIndex ou None se o backend não suportar.
+    """
+    if not raw_scan_supported():
+        return None
+    cap = _open_raw(path)
+    if cap is None:
+        return None
+
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30 # Fallback
+    pts, key_pts = [], []
+    while cap.grab():
+        us = int(round(cap.get(cv2.CAP_PROP_POS_MSEC) * 1000))
+        pts.append(us)
+        if cap.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME):
+            key_pts.append(us)
+    cap.release()
+    if not pts:
+        return None
+
+    # Pacotes vêm na ordem de decodificação: a ordem de exibição é a dos PTS
+    pts_us = np.sort(np.asarray(pts, dtype=np.int64))
+    keyframes = np.unique(np.searchsorted(pts_us, np.asarray(key_pts, dtype=np.int64)))
+    return KeyframeIndex(pts_us, keyframes, fps)
+
+
+def default_index_dir():
+    from src.core.thumbnail_cache import default_cache_dir
+    return os.path.join(os.path.dirname(default_cache_dir()), "keyframes")
+
+
+def index_file(path, index_dir=None):
+    """Arquivo do índice de `path` (chave: caminho + tamanho + mtime), ou None se o vídeo não existir."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    identity = f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}"
+    key = hashlib.sha1(identity.encode("utf-8")).hexdigest()
+    return os.path.join(index_dir or default_index_dir(), f"{key}.npz")
+
+
+def load_index(path, index_dir=None):
+    """Índice já gravado de `path` (não varre o arquivo)."""
+    file_path = index_file(path, index_dir)
+    return KeyframeIndex.load(file_path) if file_path else None
+
+
+def load_or_build_index(path, index_dir=None):
+    """Índice gravado de `path`; se não houver, varre o vídeo e grava o sidecar."""
+    file_path = index_file(path, index_dir)
+    if file_path is None:
+        return None
+    index = KeyframeIndex.load(file_path)
+    if index is not None:
+        return index
+
+    index = build_index(path)
+    if index is not None:
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            index.save(file_path)
+        except OSError as e:
+            print(f"Erro ao salvar índice de keyframes de {path}: {e}")
+    return index
+
+
+def seek_exact(cap, target, next_frame=None, index=None):
+    """
+    Deixa `cap` pronto para o próximo read() devolver o quadro `target`.
+    Com o índice, decodifica para frente (grab) quando isso custa menos que o seek do
+    OpenCV, que sempre recomeça num keyframe antes de `target - 16`.
+    Retorna True se fez um seek.
+    """
+    if next_frame == target:
+        return False
+    grabs = index.forward_grabs(target, next_frame) if index is not None else None
+    if grabs is not None:
+        for _ in range(grabs):
+            if not cap.grab():
+                break
+        return False
+    cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+    return True
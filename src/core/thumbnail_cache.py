@@ -0,0 +1,235 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from PySide6.QtCore import QStandardPaths, QBuffer, QIODevice
+from PySide6.QtGui import QImage
+
+from src.config import THUMBNAIL_CACHE_MAX_BYTES, THUMBNAIL_CACHE_JPEG_QUALITY
+
+
+def default_cache_dir():
+    base = QStandardPaths.writableLocation(QStandardPaths.CacheLocation)
+    if not base:
+        base = os.path.join(os.path.expanduser("~"), ".cache", "tgmd3-viewer")
+    return os.path.join(base, "thumbnails")
+
+
+class ThumbnailCache:
+    """
+    Cache persistente de thumbnails: um arquivo por vídeo/nível com os JPEGs de cada
+    thumbnail concatenados + um índice JSON com a posição (offset, tamanho) de cada um.
+    Os JPEGs voltam como estão, sem decodificar nem recomprimir.
+    A chave é derivada de caminho + tamanho + mtime, então um arquivo alterado
+    simplesmente deixa de bater e é regenerado.
+    Pode ser usado a partir da thread do ThumbnailWorker.
+    """
+    INDEX_FILE = "index.json"
+
+    def __init__(self, cache_dir=None, max_bytes=THUMBNAIL_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.entries = {}  # key -> metadados do arquivo de thumbnails
+        self.hits = 0
+        self.misses = 0
+        self.partial_hits = 0 # Entradas parciais (geração interrompida) retomadas
+        self._lock = threading.Lock()
+        self._dirty = False
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_index()
+
+    # --- Chaves ---
+
+    @staticmethod
+    def video_key(path, interval):
+        """Retorna a chave do vídeo ou None se o arquivo não existir."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        # Nível normalizado: 3 (THUMBNAIL_LEVELS) e 3.0 (sinal Signal(float)) são a mesma chave
+        identity = f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}|{float(interval):g}"
+        return hashlib.sha1(identity.encode("utf-8")).hexdigest()
+
+    # --- Leitura / Escrita ---
+
+    def load(self, path, interval):
+        """
+        Retorna (images, complete) ou None em caso de miss.
+        `images` é posicional (índice = posição do thumbnail): buffers JPEG (bytes), ou None
+        onde o quadro falhou ou ainda não foi gerado. complete=False indica uma geração
+        interrompida, a retomar.
+        """
+        key = self.video_key(path, interval)
+        with self._lock:
+            entry = self.entries.get(key) if key else None
+            if entry is None:
+                self.misses += 1
+                return None
+
+            data = self._read_blob(entry)
+            if data is None:
+                # Arquivo sumiu, corrompeu ou é do formato antigo (sprite sheet): descarta a entrada
+                self._remove_entry(key)
+                self._dirty = True
+                self.misses += 1
+                return None
+
+            entry["last_access"] = time.time()
+            self._dirty = True
+            complete = entry.get("complete", True)
+            if complete:
+                self.hits += 1
+            else:
+                self.partial_hits += 1
+
+        images = [data[tile[0]:tile[0] + tile[1]] if tile else None for tile in entry["tiles"]]
+        return images, complete
+
+    def store(self, path, interval, images, complete=True):
+        """
+        Grava os thumbnails de um vídeo/nível e registra no índice.
+        `images` é posicional (índice = posição do thumbnail); None marca um quadro que falhou.
+        Aceita buffers JPEG (bytes, gravados como estão) ou QImages.
+        complete=False grava uma geração interrompida para ser retomada depois.
+        """
+        key = self.video_key(path, interval)
+        images = [self._encode(img) if isinstance(img, QImage) else img for img in images]
+        if key is None or not any(images):
+            return
+
+        tiles, offset = [], 0
+        for img in images:
+            if img:
+                tiles.append([offset, len(img)])
+                offset += len(img)
+            else:
+                tiles.append(None)
+
+        file_name = f"{key}.bin"
+        file_path = os.path.join(self.cache_dir, file_name)
+        try:
+            with open(file_path, "wb") as f:
+                f.write(b"".join(img for img in images if img))
+        except OSError as e:
+            print(f"Erro ao salvar thumbnails no cache: {file_path}: {e}")
+            return
+
+        with self._lock:
+            # Entradas antigas do mesmo arquivo (tamanho/mtime diferentes) ficam obsoletas
+            self._invalidate_source(os.path.abspath(path), interval, keep=key)
+            self.entries[key] = {
+                "file": file_name,
+                "source": os.path.abspath(path),
+                "interval": float(interval),
+                "complete": complete,
+                "tiles": tiles,
+                "bytes": offset,
+                "last_access": time.time(),
+            }
+            self._evict_over_budget()
+            self._dirty = True
+        self.flush()
+
+    def invalidate(self, path):
+        """Remove todas as entradas de um vídeo (qualquer intervalo)."""
+        with self._lock:
+            self._invalidate_source(os.path.abspath(path))
+            self._dirty = True
+        self.flush()
+
+    def clear(self):
+        with self._lock:
+            for key in list(self.entries):
+                self._remove_entry(key)
+            self._dirty = True
+        self.flush()
+
+    def total_bytes(self):
+        return sum(e.get("bytes", 0) for e in self.entries.values())
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "partial_hits": self.partial_hits,
+            "entries": len(self.entries),
+            "bytes": self.total_bytes(),
+        }
+
+    # --- Índice ---
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            index_path = os.path.join(self.cache_dir, self.INDEX_FILE)
+            tmp_path = index_path + ".tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(self.entries, f)
+                os.replace(tmp_path, index_path)
+                self._dirty = False
+            except Exception as e:
+                print(f"Erro ao salvar índice do cache de thumbnails: {e}")
+
+    def _load_index(self):
+        index_path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        if not os.path.exists(index_path):
+            return
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except Exception as e:
+            print(f"Erro ao carregar índice do cache de thumbnails: {e}")
+            self.entries = {}
+
+    @staticmethod
+    def _encode(image):
+        if image.isNull():
+            return None
+        buffer = QBuffer()
+        buffer.open(QIODevice.WriteOnly)
+        image.convertToFormat(QImage.Format_RGB888).save(buffer, "JPG", THUMBNAIL_CACHE_JPEG_QUALITY)
+        return bytes(buffer.data())
+
+    # --- Internos (chamar com o lock adquirido) ---
+
+    def _read_blob(self, entry):
+        if "tiles" not in entry:
+            return None
+        try:
+            with open(os.path.join(self.cache_dir, entry["file"]), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        return data if len(data) == entry.get("bytes") else None
+
+    def _invalidate_source(self, source, interval=None, keep=None):
+        for key, entry in list(self.entries.items()):
+            if key == keep or entry.get("source") != source:
+                continue
+            if interval is not None and entry.get("interval") != interval:
+                continue
+            self._remove_entry(key)
+
+    def _evict_over_budget(self):
+        # LRU: remove os vídeos/níveis acessados há mais tempo até caber no limite
+        total = self.total_bytes()
+        for key, entry in sorted(self.entries.items(), key=lambda kv: kv[1].get("last_access", 0)):
+            if total <= self.max_bytes:
+                break
+            total -= entry.get("bytes", 0)
+            self._remove_entry(key)
+
+    def _remove_entry(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        try:
+            os.remove(os.path.join(self.cache_dir, entry["file"]))
+        except OSError:
+            pass
@@ -0,0 +1,110 @@
+from collections import OrderedDict
+
+from PySide6.QtCore import QBuffer, QIODevice
+from PySide6.QtGui import QImage, QPixmap
+
+from src.config import THUMBNAIL_MEMORY_BUDGET_BYTES, THUMBNAIL_JPEG_QUALITY
+
+
+class ThumbnailStore:
+    """
+    Thumbnails da timeline com orçamento de memória.
+    Todo thumbnail fica guardado comprimido (JPEG, codificado pelo worker); só os usados
+    recentemente ficam decodificados como QPixmap, com LRU limitado a `budget_bytes`.
+    Despejar só descarta o pixmap: ele é decodificado de novo dos bytes quando voltar à tela.
+    Chave: (path, level, index). Uso apenas na thread da UI (QPixmap).
+    """
+
+    def __init__(self, budget_bytes=THUMBNAIL_MEMORY_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self._encoded = {}             # chave -> bytes JPEG
+        self._pixmaps = OrderedDict()  # chave -> QPixmap (mais recente no fim)
+        self._levels = {}              # path -> {level: quantidade}
+        self.pixmap_bytes = 0
+        self.encoded_bytes = 0
+        self.evictions = 0
+
+    def put(self, path, level, index, image):
+        """`image` é um buffer JPEG (bytes); um QImage é aceito, mas codificado aqui (thread da UI)."""
+        data = bytes(image) if isinstance(image, (bytes, bytearray)) else self._encode(image)
+        if not data: return
+
+        key = (path, level, index)
+        if key in self._encoded:
+            self.encoded_bytes -= len(self._encoded.pop(key))
+        else:
+            counts = self._levels.setdefault(path, {})
+            counts[level] = counts.get(level, 0) + 1
+        self._drop_pixmap(key) # Pixmap antigo (thumbnail substituído, ex.: prévia -> refinado)
+        self._encoded[key] = data
+        self.encoded_bytes += len(data)
+
+    def get(self, path, level, index):
+        key = (path, level, index)
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(key)
+            return pixmap
+
+        data = self._encoded.get(key)
+        if data is None:
+            return None
+        pixmap = QPixmap()
+        if not pixmap.loadFromData(data, "JPG"):
+            return None
+        self._insert_pixmap(key, pixmap)
+        return pixmap
+
+    def has_level(self, path, level):
+        return self._levels.get(path, {}).get(level, 0) > 0
+
+    def levels(self, path):
+        return [level for level, count in self._levels.get(path, {}).items() if count > 0]
+
+    def clear(self):
+        self._encoded = {}
+        self._pixmaps = OrderedDict()
+        self._levels = {}
+        self.pixmap_bytes = 0
+        self.encoded_bytes = 0
+
+    def memory_usage(self):
+        return {
+            "pixmaps": len(self._pixmaps),
+            "pixmap_bytes": self.pixmap_bytes,
+            "encoded": len(self._encoded),
+            "encoded_bytes": self.encoded_bytes,
+            "budget_bytes": self.budget_bytes,
+            "evictions": self.evictions,
+        }
+
+    # --- Internos ---
+
+    @staticmethod
+    def _pixmap_size(pixmap):
+        return pixmap.width() * pixmap.height() * max(1, pixmap.depth() // 8)
+
+    def _insert_pixmap(self, key, pixmap):
+        self._pixmaps[key] = pixmap
+        self.pixmap_bytes += self._pixmap_size(pixmap)
+        self._evict_over_budget()
+
+    def _drop_pixmap(self, key):
+        pixmap = self._pixmaps.pop(key, None)
+        if pixmap is not None:
+            self.pixmap_bytes -= self._pixmap_size(pixmap)
+
+    def _evict_over_budget(self):
+        # Mantém pelo menos o pixmap recém-inserido
+        while self.pixmap_bytes > self.budget_bytes and len(self._pixmaps) > 1:
+            # Os bytes JPEG continuam guardados: despejar não codifica nada
+            key, pixmap = self._pixmaps.popitem(last=False)
+            self.pixmap_bytes -= self._pixmap_size(pixmap)
+            self.evictions += 1
+
+    @staticmethod
+    def _encode(image):
+        buffer = QBuffer()
+        buffer.open(QIODevice.WriteOnly)
+        image.convertToFormat(QImage.Format_RGB888).save(buffer, "JPG", THUMBNAIL_JPEG_QUALITY)
+        return bytes(buffer.data())
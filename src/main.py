@@ -95,4 +95,7 @@ def main():
     sys.exit(app.exec())
 
 if __name__ == "__main__":
+    # Necessário para o pool de processos dos thumbnails em executáveis congelados (Windows)
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
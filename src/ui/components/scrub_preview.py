@@ -0,0 +1,60 @@
+from PySide6.QtCore import Qt, QPoint, QRect
+from PySide6.QtGui import QPainter, QColor, QFont
+from PySide6.QtWidgets import QWidget
+
+from src.config import SCRUB_PREVIEW_HEIGHT
+
+
+class ScrubPreviewPopup(QWidget):
+    """
+    Janela flutuante com o quadro sob o mouse na faixa de vídeo da timeline.
+    Só desenha pixmaps já em memória (ThumbnailStore): não decodifica nem toca no player.
+    """
+    LABEL_HEIGHT = 16
+    MARGIN = 8 # Distância entre o popup e o cursor
+
+    def __init__(self, parent=None):
+        super().__init__(parent, Qt.ToolTip | Qt.FramelessWindowHint)
+        self.setAttribute(Qt.WA_ShowWithoutActivating)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.pixmap = None
+        self.text = ""
+
+    def show_preview(self, pixmap, text, global_pos):
+        """Mostra o quadro acima de `global_pos` (coordenadas de tela)."""
+        self.pixmap = pixmap
+        self.text = text
+
+        if pixmap is not None and not pixmap.isNull():
+            # Quadros de níveis mais grossos podem ter outra altura: escala para a da prévia
+            w = max(1, round(pixmap.width() * SCRUB_PREVIEW_HEIGHT / max(1, pixmap.height())))
+        else:
+            w = SCRUB_PREVIEW_HEIGHT * 16 // 9
+        h = SCRUB_PREVIEW_HEIGHT + self.LABEL_HEIGHT
+        if self.width() != w or self.height() != h:
+            self.resize(w, h)
+
+        self.move(global_pos + QPoint(-w // 2, -h - self.MARGIN))
+        if not self.isVisible():
+            self.show()
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#111111"))
+
+        frame_rect = QRect(0, 0, self.width(), SCRUB_PREVIEW_HEIGHT)
+        if self.pixmap is not None and not self.pixmap.isNull():
+            painter.setRenderHint(QPainter.SmoothPixmapTransform)
+            painter.drawPixmap(frame_rect, self.pixmap)
+        else:
+            painter.setPen(QColor("#666"))
+            painter.drawText(frame_rect, Qt.AlignCenter, "Gerando prévia...")
+
+        painter.setPen(QColor("#FFFFFF"))
+        painter.setFont(QFont("Arial", 8))
+        painter.drawText(QRect(0, SCRUB_PREVIEW_HEIGHT, self.width(), self.LABEL_HEIGHT), Qt.AlignCenter, self.text)
+
+        painter.setPen(QColor("#FF5252"))
+        painter.drawRect(self.rect().adjusted(0, 0, -1, -1))
+        painter.end()
@@ -1,9 +1,9 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QTabWidget, QLabel, 
                                 QScrollArea, QFrame, QHBoxLayout)
 from PySide6.QtCore import Qt, QMimeData
-import os
-from PySide6.QtGui import QDrag, QPixmap
-from src.config import SKILLS, ASSETS_DIR
+from PySide6.QtGui import QDrag
+from src.config import SKILLS
+from src.ui import skill_styles
 
 class DraggableLabel(QFrame):
     def __init__(self, index, text, color, icon_path, parent=None):
@@ -39,9 +39,9 @@ class DraggableLabel(QFrame):
         icon_label = QLabel()
         icon_label.setFixedWidth(40)
         icon_label.setAlignment(Qt.AlignCenter)
-        if icon_path and os.path.exists(icon_path):
-            pixmap = QPixmap(icon_path)
-            icon_label.setPixmap(pixmap.scaled(32, 32, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        pixmap = skill_styles.icon_pixmap(icon_path, 32, self.devicePixelRatioF())
+        if pixmap is not None:
+            icon_label.setPixmap(pixmap)
         else:
              icon_label.setText("?")
              
@@ -108,21 +108,12 @@ class SkillListWidget(QWidget):
         content_layout = QVBoxLayout(content)
         content_layout.setSpacing(10)
 
-        icon_files = [
-            "1-correr.png", "2-galopar.png", "3-saltar.png", "4-saltitar.png",
-            "5-saltar-horizontal.png", "6-deslizar.png", "7-rebater2maos.png", 
-            "8-rebater1mao.png", "9-quicar.png", "10-pegar.png", "11-chutar.png",
-            "13-lançar-por-baixo.png", "12-arremessar-por-cima.png"
-        ]
-
         for i, skill in enumerate(SKILLS):
             # Simula o botão colorido (Laranja para 1-6, Azul para 7-13)
             # 1-6 (indexes 0-5) -> Laranja
             # 7-13 (indexes 6-12) -> Azul
-            color = "#FF9800" if i < 6 else "#00BCD4"
-            
-            icon_name = icon_files[i] if i < len(icon_files) else ""
-            icon_path = os.path.join(ASSETS_DIR, "icones_habilidades", icon_name)
+            color = skill_styles.skill_button_color(i)
+            icon_path = skill_styles.skill_icon_path(i)
             
             # Pass 1-based index for display
             btn = DraggableLabel(i+1, skill, color, icon_path)
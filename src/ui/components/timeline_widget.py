@@ -1,16 +1,69 @@
+import math
+from collections import OrderedDict
 from pathlib import Path
-from PySide6.QtCore import Qt, Signal, QPointF, QRectF
-from PySide6.QtGui import QPainter, QColor, QBrush, QPen, QFont, QCursor, QAction
-from PySide6.QtWidgets import QWidget, QMenu
+from PySide6.QtCore import Qt, Signal, QPointF, QRectF, QRect, QTimer, QEvent
+from PySide6.QtGui import QPainter, QColor, QBrush, QPen, QFont, QCursor, QAction, QStaticText
+from PySide6.QtWidgets import QWidget, QMenu, QScrollBar, QApplication
 
 from config import (
-    THUMBNAIL_HEIGHT, ANNOTATION_TRACK_HEIGHT,
-    RULER_HEIGHT, THUMBNAIL_INTERVAL_SECONDS,
+    THUMBNAIL_HEIGHT, ANNOTATION_TRACK_HEIGHT, ANNOTATION_LANE_HEIGHT, ANNOTATION_MAX_VISIBLE_LANES,
+    RULER_HEIGHT,
     RULER_TICK_HEIGHT, CLIP_DIVIDER_WIDTH,
-    ASSETS_DIR, SKILLS
+    SKILLS,
+    THUMBNAIL_LEVELS, THUMBNAIL_MIN_SCREEN_WIDTH,
+    THUMBNAIL_FLUSH_INTERVAL_MS, SCRUB_PREVIEW_LEVEL,
+    TIMELINE_TILE_WIDTH, TIMELINE_TILE_CACHE_SIZE,
+    RULER_TICK_STEPS, RULER_MAX_TICKS, RULER_MIN_TICK_SPACING, RULER_MIN_LABEL_SPACING,
+    TIMELINE_DEFAULT_VIEWPORT_SECONDS, TIMELINE_MAX_PIXELS_PER_SECOND, TIMELINE_ZOOM_STEP,
+    ANNOTATION_DETAIL_MIN_WIDTH, ANNOTATION_DENSITY_BIN_PX
 )
-import os
 from PySide6.QtGui import QPixmap
+from src.core.thumbnail_store import ThumbnailStore
+from src.core.annotation_index import AnnotationIndex
+from src.core.clip_layout import ClipLayout
+from src.ui.components.scrub_preview import ScrubPreviewPopup
+from src.ui import skill_styles
+
+class PlayheadOverlay(QWidget):
+    """
+    Camada transparente com a agulha, por cima da timeline.
+    Mover a agulha repinta só a faixa antiga e a nova; embaixo delas a timeline
+    apenas copia os tiles em cache.
+    """
+    HALF_WIDTH = 6 # Meia largura da faixa repintada (triângulo do topo)
+
+    def __init__(self, timeline):
+        super().__init__(timeline)
+        self.timeline = timeline
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setAttribute(Qt.WA_NoSystemBackground)
+
+    def strip(self, seconds):
+        x = int(seconds * self.timeline.pixels_per_second) - self.timeline.scroll_x
+        return QRect(x - self.HALF_WIDTH, 0, 2 * self.HALF_WIDTH + 1, self.height())
+
+    def move_playhead(self, old_seconds, new_seconds):
+        old_strip, new_strip = self.strip(old_seconds), self.strip(new_seconds)
+        if old_strip == new_strip: return
+        self.update(old_strip)
+        self.update(new_strip)
+
+    def paintEvent(self, event):
+        if not self.timeline.clips: return
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        # Desenhar agulha na posição global
+        playhead_x = self.timeline.playhead_position_global * self.timeline.pixels_per_second - self.timeline.scroll_x
+        painter.setPen(QPen(QColor("#FF5252"), 2))
+        painter.drawLine(int(playhead_x), 0, int(playhead_x), self.height())
+        
+        # Triangulo no topo
+        painter.setBrush(QBrush(QColor("#FF5252")))
+        points = [QPointF(playhead_x - 5, 0), QPointF(playhead_x + 5, 0), QPointF(playhead_x, 10)]
+        painter.drawPolygon(points)
+        painter.end()
+
 
 class TimelineWidget(QWidget):
     # (video_index, local_time, global_time, force_pause)
@@ -19,18 +72,72 @@ class TimelineWidget(QWidget):
     clip_reorder_requested = Signal(int, int)
     clip_remove_requested = Signal(int)
 
+    # Nível da pirâmide de thumbnails (segundos) que o zoom atual precisa e ainda não foi pedido
+    thumbnail_level_requested = Signal(float)
+    # Prévia densa do hover (SCRUB_PREVIEW_LEVEL) pedida só para o clipe sob o mouse, na primeira vez
+    scrub_preview_requested = Signal(int)
+
+    # Mouse passou a um clipe diferente na faixa de vídeo (candidato a pré-carregar)
+    hover_clip_changed = Signal(int)
+
+    # Número de linhas da faixa de rótulos mudou: (linhas, altura de cada linha)
+    lanes_changed = Signal(int, int, int)
+
+    # Zoom mudou (novo pixels_per_second); o scroll já foi ajustado para manter o ponto sob o cursor
+    zoom_changed = Signal(float)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setMinimumHeight(RULER_HEIGHT + ANNOTATION_TRACK_HEIGHT + THUMBNAIL_HEIGHT + 20)
+        # Os tiles cobrem todo o widget: permite ao scroll copiar os pixels já desenhados
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+
+        # Canvas virtual: o widget tem o tamanho do viewport e desenha a partir de scroll_x
+        # (posição em px do conteúdo). A barra é da timeline; quem a monta só a posiciona no layout.
+        self.scroll_x = 0
+        self.scroll_bar = QScrollBar(Qt.Horizontal)
+        self.scroll_bar.setRange(0, 0)
+        self.scroll_bar.valueChanged.connect(self._on_scroll)
         
         self.clips = []
         self.annotations = []
-        self.thumbnails = {}
+
+        # Índices para desenhar só o que está na área exposta (busca binária)
+        self.clip_layout = ClipLayout() # Offsets globais dos clipes (compartilhado com o editor)
+        self.annotation_index = AnnotationIndex() # Hit-test e desenho em O(log n), com as linhas dos rótulos
+        self._lane_count = 1   # Linhas mostradas (no máximo ANNOTATION_MAX_VISIBLE_LANES)
+        self._hidden_lanes = 0 # Linhas além do limite, agrupadas na última
+
+        # Conteúdo estático (régua, clipes, thumbnails, anotações) em tiles de
+        # TIMELINE_TILE_WIDTH px, refeitos só quando algo muda; a agulha fica no overlay
+        self._tiles = OrderedDict() # índice do tile -> QPixmap (LRU)
+        self.playhead_overlay = PlayheadOverlay(self)
+        # Thumbnails por (path, level, index) com orçamento de memória (LRU de pixmaps)
+        self.thumbnail_store = ThumbnailStore()
+        self.requested_levels = set()
+
+        # Thumbnails recebidos e ainda não aplicados (entregues em lote pelo timer)
+        self._pending_thumbnails = []
+        self._thumbnail_flush_timer = QTimer(self)
+        self._thumbnail_flush_timer.setSingleShot(True)
+        self._thumbnail_flush_timer.setInterval(THUMBNAIL_FLUSH_INTERVAL_MS)
+        self._thumbnail_flush_timer.timeout.connect(self._flush_thumbnails)
+
+        # Prévia do hover na faixa de vídeo (criada no primeiro uso)
+        self.scrub_popup = None
+        self.hovered_clip = None
+        self._scrub_requested = set() # Caminhos cuja prévia densa já foi pedida
         
         self.total_duration_display = 0 # Duração para fins de cálculo de width
         self.playhead_position_global = 0 # Posição absoluta na renderização
         
         self.pixels_per_second = 50.0 # Será recalculado
+        self.zoom_pixels_per_second = None # None = automático (TIMELINE_DEFAULT_VIEWPORT_SECONDS na tela)
+        self.grabGesture(Qt.PinchGesture)
+
+        # Régua: passos (menor, maior) do zoom atual e rótulos já preparados
+        self._ruler_steps = (1.0, 5.0)
+        self._ruler_labels = {} # (tempo em ms, passo maior) -> QStaticText
 
         self.setMouseTracking(True)
         self.setAcceptDrops(True)
@@ -46,89 +153,334 @@ class TimelineWidget(QWidget):
         # O offset de cada clipe deve ser calculado pelo controller, mas aqui recalculamos 
         # para fins de desenho linear se necessário.
         # Assumiremos que a lista vem ordenada.
-        
-        self.update()
+        self.clip_layout.set_clips(self.clips)
+        self.invalidate_static()
 
     def set_data(self, clips_data, annotations_data):
         self.clips = clips_data
         self.annotations = annotations_data
-        self.update()
+        self.clip_layout.set_clips(self.clips)
+        self.annotation_index.rebuild(self.annotations)
+        self._sync_lanes()
+        self.invalidate_static()
 
-    def add_thumbnail(self, path, index, qimage):
-        if path not in self.thumbnails: self.thumbnails[path] = {}
-        # Converte QImage para QPixmap para desenhar
-        from PySide6.QtGui import QPixmap
-        self.thumbnails[path][index] = QPixmap.fromImage(qimage)
-        self.update()
+    def add_thumbnail(self, path, level, index, image):
+        """`image` pode ser um QImage ou um buffer JPEG (bytes) vindo do pool de processos."""
+        self.add_thumbnails([(path, level, index, image)])
+
+    def add_thumbnails(self, batch):
+        """
+        Recebe um lote de (path, level, index, image). Os lotes são acumulados e aplicados
+        no máximo a cada THUMBNAIL_FLUSH_INTERVAL_MS, repintando só os clipes afetados.
+        """
+        self._pending_thumbnails.extend(batch)
+        if not self._thumbnail_flush_timer.isActive():
+            self._thumbnail_flush_timer.start()
+
+    def _flush_thumbnails(self):
+        pending, self._pending_thumbnails = self._pending_thumbnails, []
+        if not pending: return
+
+        paths = set()
+        for path, level, index, image in pending:
+            self.thumbnail_store.put(path, level, index, image)
+            paths.add(path)
+
+        # Invalida apenas a faixa de vídeo dos clipes que receberam thumbnails
+        self._ensure_layout()
+        video_track_y = self.video_track_y()
+        for i, clip in enumerate(self.clips):
+            if clip.get('caminho', "") in paths:
+                x = self.clip_layout.offset(i) * self.pixels_per_second
+                w = self.clip_layout.duration(i) * self.pixels_per_second
+                self.invalidate_static(QRect(int(x), video_track_y, int(math.ceil(w)) + 1, THUMBNAIL_HEIGHT))
+
+    def pick_thumbnail_level(self, pixels_per_second):
+        """Nível mais fino cujos thumbnails ocupam pelo menos THUMBNAIL_MIN_SCREEN_WIDTH px."""
+        for level in sorted(THUMBNAIL_LEVELS):
+            if level * pixels_per_second >= THUMBNAIL_MIN_SCREEN_WIDTH:
+                return level
+        return max(THUMBNAIL_LEVELS)
+
+    def _request_thumbnail_level(self, level):
+        if level in self.requested_levels: return
+        self.requested_levels.add(level)
+        # Emite fora do paintEvent
+        QTimer.singleShot(0, self, lambda: self.thumbnail_level_requested.emit(level))
+
+    def _thumbnail_level_for_clip(self, path, level):
+        """Nível pedido ou, enquanto ele é gerado, o nível disponível mais próximo (None se nenhum)."""
+        if self.thumbnail_store.has_level(path, level):
+            return level
+        # A prévia densa do hover não entra na faixa de vídeo
+        available = [l for l in self.thumbnail_store.levels(path) if l in THUMBNAIL_LEVELS]
+        if not available:
+            return None
+        return min(available, key=lambda l: abs(math.log(l / level)))
 
     def clear_thumbnails(self):
-        self.thumbnails = {}
-        self.update()
+        self._pending_thumbnails = []
+        self.thumbnail_store.clear()
+        self.invalidate_static()
 
     def reset(self):
         self.clips = []
         self.annotations = []
-        self.thumbnails = {}
+        self.clip_layout.set_clips(self.clips)
+        self.annotation_index.rebuild(self.annotations)
+        self._sync_lanes()
+        self.thumbnail_store.clear()
+        self.requested_levels = set()
+        self._scrub_requested = set()
+        self._pending_thumbnails = []
+        self.hide_scrub_preview()
         self.total_duration_display = 0
         self.playhead_position_global = 0
         self.pixels_per_second = 50.0 # Reset
-        self.update()
+        self.zoom_pixels_per_second = None
+        self.scroll_bar.setValue(0)
+        self.invalidate_static()
+        self.playhead_overlay.update()
 
     def update_playhead_position(self, seconds):
         # Aqui seconds deve ser global (soma das durações anteriores + local)
+        old_seconds = self.playhead_position_global
         self.playhead_position_global = seconds
-        self.update()
+        # Só a agulha se move: nada do conteúdo estático é redesenhado
+        self.playhead_overlay.move_playhead(old_seconds, seconds)
 
     def paintEvent(self, event):
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        painter.fillRect(self.rect(), QColor("#212121"))
 
         if not self.clips:
+            painter.fillRect(self.rect(), QColor("#212121"))
             painter.setPen(QColor("#666"))
             painter.drawText(self.rect(), Qt.AlignCenter, "Nenhum vídeo carregado")
             painter.end()
             return
 
+        self._update_zoom()
+
+        # Nível da pirâmide de thumbnails para o zoom atual (gerado sob demanda)
+        self._request_thumbnail_level(self.pick_thumbnail_level(self.pixels_per_second))
+
+        # Conteúdo estático vem dos tiles em cache (a agulha fica no PlayheadOverlay)
+        exposed = event.rect().intersected(self.rect()).translated(self.scroll_x, 0)
+        for tile_index in range(exposed.left() // TIMELINE_TILE_WIDTH, exposed.right() // TIMELINE_TILE_WIDTH + 1):
+            painter.drawPixmap(tile_index * TIMELINE_TILE_WIDTH - self.scroll_x, 0, self._tile(tile_index))
+        painter.end()
+
+    def _update_zoom(self):
         # 1. Calcular Zoom Dinâmico e Largura Total
-        # Pega a largura do viewport (a area visível do scroll), não o widget inteiro
-        # Quando setWidget é usado no QScrollArea, o parent() é o viewport.
-        viewport_width = self.parent().width() if self.parent() else self.width()
-        viewport_duration = 30.0
-        
-        # Pixels por segundo base para mostrar 30s na tela
-        self.pixels_per_second = max(viewport_width / viewport_duration, 10.0) 
+        # O widget é o próprio viewport (o conteúdo é virtual)
+        viewport_width = self.width()
+        self._ensure_layout()
         
-        # Define o tamanho total do widget para forçar o scroll
-        total_width = 0
-        for clip in self.clips:
-            dur = clip.get('duracao', 0) if isinstance(clip, dict) else clip.duration
-            total_width += dur * self.pixels_per_second
-            
-        # Margem extra e atualiza geometria
-        min_w = int(total_width + 100)
-        if self.minimumWidth() != min_w:
-            self.setMinimumWidth(min_w)
+        # Pixels por segundo base para mostrar 30s na tela; com zoom do usuário, o valor
+        # escolhido limitado entre "projeto inteiro na tela" e o nível de quadro
+        default_pps = max(viewport_width / TIMELINE_DEFAULT_VIEWPORT_SECONDS, 10.0)
+        if self.zoom_pixels_per_second is None:
+            pixels_per_second = default_pps
+        else:
+            pixels_per_second = min(max(self.zoom_pixels_per_second, self._min_pixels_per_second(viewport_width)),
+                                    TIMELINE_MAX_PIXELS_PER_SECOND)
+        if pixels_per_second != self.pixels_per_second:
+            self.pixels_per_second = pixels_per_second
+            self._ruler_steps = self._pick_ruler_steps(pixels_per_second, viewport_width)
+            self._tiles.clear() # Zoom mudou: todo o conteúdo estático muda de escala
+            self.playhead_overlay.update()
         
+        # Largura do conteúdo só define o alcance da barra (nenhuma mudança de geometria)
+        self._update_scroll_range()
+
+    # --- Canvas Virtual (Scroll) ---
+
+    def content_width(self):
+        # Margem extra depois do último clipe
+        return int(self.clip_layout.total * self.pixels_per_second + 100)
+
+    def _update_scroll_range(self):
+        maximum = max(0, self.content_width() - self.width())
+        if self.scroll_bar.maximum() != maximum:
+            self.scroll_bar.setRange(0, maximum)
+        if self.scroll_bar.pageStep() != max(1, self.width()):
+            self.scroll_bar.setPageStep(max(1, self.width()))
+            self.scroll_bar.setSingleStep(max(1, self.width() // 20))
+
+    def set_scroll_x(self, x):
+        """Rola até a posição `x` (px do conteúdo), limitada ao alcance da barra."""
+        self.scroll_bar.setValue(int(x))
+
+    def _on_scroll(self, value):
+        dx = self.scroll_x - value
+        if dx == 0: return
+        old_playhead = self.playhead_overlay.strip(self.playhead_position_global)
+        self.scroll_x = value
+        if abs(dx) >= self.width():
+            self.update()
+            return
+        # Copia os pixels que continuam visíveis; só a faixa nova é repintada (dos tiles).
+        # A cópia também leva a agulha: repinta onde ela foi parar e onde deve ficar.
+        self.scroll(dx, 0, self.rect())
+        self.playhead_overlay.update(old_playhead.translated(dx, 0))
+        self.playhead_overlay.update(self.playhead_overlay.strip(self.playhead_position_global))
+
+    # --- Zoom ---
+
+    def _min_pixels_per_second(self, viewport_width):
+        # Visão geral: a sessão inteira cabe no viewport (sem passar do zoom padrão em projetos curtos)
+        default_pps = max(viewport_width / TIMELINE_DEFAULT_VIEWPORT_SECONDS, 10.0)
+        if self.clip_layout.total <= 0:
+            return default_pps
+        return min(default_pps, (viewport_width - 100) / self.clip_layout.total)
+
+    def zoom_by(self, factor, anchor_x=None):
+        """Multiplica o zoom por `factor`, mantendo parado o tempo em `anchor_x` (x no widget)."""
+        if not self.clips or factor <= 0: return
+        old_pps = self.pixels_per_second
+        if anchor_x is None:
+            anchor_x = self.playhead_position_global * old_pps - self.scroll_x
+        anchor_time = (anchor_x + self.scroll_x) / old_pps
+
+        self.zoom_pixels_per_second = old_pps * factor
+        self._update_zoom()
+        if self.pixels_per_second == old_pps: return
+
+        # Tudo muda de escala: repinta inteiro (sem cópia do scroll)
+        target = min(max(0, int(anchor_time * self.pixels_per_second - anchor_x)), self.scroll_bar.maximum())
+        self.scroll_x = target
+        self.scroll_bar.setValue(target)
+        self._request_thumbnail_level(self.pick_thumbnail_level(self.pixels_per_second))
+        self.update()
+        self.zoom_changed.emit(self.pixels_per_second)
+
+    def wheelEvent(self, event):
+        if event.modifiers() & Qt.ControlModifier:
+            steps = event.angleDelta().y() / 120
+            if steps:
+                self.zoom_by(TIMELINE_ZOOM_STEP ** steps, event.position().x())
+            event.accept()
+            return
+        # Roda sem Ctrl rola a timeline
+        QApplication.sendEvent(self.scroll_bar, event)
+
+    def event(self, event):
+        # Pinça: trackpad (gesto nativo) ou tela sensível ao toque (QPinchGesture)
+        if event.type() == QEvent.NativeGesture and event.gestureType() == Qt.ZoomNativeGesture:
+            self.zoom_by(1.0 + event.value(), event.position().x())
+            return True
+        if event.type() == QEvent.Gesture:
+            pinch = event.gesture(Qt.PinchGesture)
+            if pinch is not None:
+                center = self.mapFromGlobal(pinch.centerPoint().toPoint())
+                self.zoom_by(pinch.scaleFactor(), center.x())
+                return True
+        return super().event(event)
+
+    # --- Régua ---
+
+    @staticmethod
+    def _pick_ruler_steps(pixels_per_second, viewport_width):
+        """(passo dos tiques, passo dos rótulos) em segundos para o zoom atual."""
+        min_tick_px = max(RULER_MIN_TICK_SPACING, viewport_width / RULER_MAX_TICKS)
+        minor = next((s for s in RULER_TICK_STEPS if s * pixels_per_second >= min_tick_px), RULER_TICK_STEPS[-1])
+        # Rótulos num múltiplo do passo dos tiques
+        major = next((s for s in RULER_TICK_STEPS
+                      if s >= minor and s * pixels_per_second >= RULER_MIN_LABEL_SPACING
+                      and abs(s / minor - round(s / minor)) < 1e-6),
+                     minor * math.ceil(RULER_MIN_LABEL_SPACING / (minor * pixels_per_second)))
+        return minor, major
+
+    def _ruler_label(self, t, major):
+        key = (int(round(t * 1000)), major)
+        label = self._ruler_labels.get(key)
+        if label is None:
+            if len(self._ruler_labels) > 4096:
+                self._ruler_labels = {}
+            label = QStaticText(self._format_ruler_time(t, major))
+            label.setPerformanceHint(QStaticText.AggressiveCaching)
+            self._ruler_labels[key] = label
+        return label
+
+    @staticmethod
+    def _format_ruler_time(t, major):
+        # Casas decimais só quando os rótulos ficam abaixo de 1s (zoom de quadro)
+        decimals = 2 if major < 0.1 else 1 if major < 1 else 0
+        if t < 60:
+            return f"{t:.{decimals}f}s" if decimals else f"{int(round(t))}s"
+        minutes, seconds = divmod(round(t, decimals), 60)
+        hours, minutes = divmod(int(minutes), 60)
+        width = 3 + decimals if decimals else 2
+        seconds = f"{seconds:0{width}.{decimals}f}"
+        if hours:
+            return f"{hours}:{minutes:02d}:{seconds}"
+        return f"{minutes}:{seconds}"
+
+    # --- Tiles do Conteúdo Estático ---
+
+    def _tile(self, tile_index):
+        """Pixmap (TIMELINE_TILE_WIDTH x altura) com régua, clipes, thumbnails e anotações."""
+        pixmap = self._tiles.get(tile_index)
+        if pixmap is not None:
+            self._tiles.move_to_end(tile_index)
+            return pixmap
+
+        dpr = self.devicePixelRatioF()
+        pixmap = QPixmap(int(TIMELINE_TILE_WIDTH * dpr), int(self.height() * dpr))
+        pixmap.setDevicePixelRatio(dpr)
+        tile_rect = QRect(tile_index * TIMELINE_TILE_WIDTH, 0, TIMELINE_TILE_WIDTH, self.height())
+
+        painter = QPainter(pixmap)
+        painter.translate(-tile_rect.left(), 0)
+        self._paint_static(painter, tile_rect)
+        painter.end()
+
+        self._tiles[tile_index] = pixmap
+        while len(self._tiles) > TIMELINE_TILE_CACHE_SIZE:
+            self._tiles.popitem(last=False)
+        return pixmap
+
+    def invalidate_static(self, rect=None):
+        """Descarta os tiles que cruzam `rect` (todos se None) e agenda a repintura."""
+        if rect is None:
+            self._tiles.clear()
+            self.update()
+            return
+        first = rect.left() // TIMELINE_TILE_WIDTH
+        last = rect.right() // TIMELINE_TILE_WIDTH
+        for tile_index in [t for t in self._tiles if first <= t <= last]:
+            del self._tiles[tile_index]
+        self.update(rect.translated(-self.scroll_x, 0))
+
+    def _paint_static(self, painter, exposed):
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.fillRect(exposed, QColor("#212121"))
+
         # Altura de componentes
         ruler_y_end = RULER_HEIGHT
-        video_track_y = RULER_HEIGHT + ANNOTATION_TRACK_HEIGHT
-        
-        current_x_offset = 0.0
+        video_track_y = self.video_track_y()
+
+        # Só o que cruza a área exposta (o tile sendo desenhado)
+        pps = self.pixels_per_second
+        visible_start = exposed.left() / pps
+        visible_end = (exposed.right() + 1) / pps
+
+        thumb_level = self.pick_thumbnail_level(pps)
         
         painter.setFont(QFont("Arial", 8))
+
+        # Clipes visíveis por busca binária nos inícios (o divisor do anterior pode estar na borda)
+        first_clip, last_clip = self.clip_layout.index_range(visible_start - CLIP_DIVIDER_WIDTH / pps, visible_end)
         
-        for i, clip in enumerate(self.clips):
-            duration = clip.get('duracao', 0) if isinstance(clip, dict) else clip.duration
-            clip_width = duration * self.pixels_per_second
+        for i in range(first_clip, last_clip + 1):
+            clip = self.clips[i]
+            duration = self.clip_layout.duration(i)
+            current_x_offset = self.clip_layout.offset(i) * pps
+            clip_width = duration * pps
             
             # --- Fundo do Clipe ---
             clip_rect = QRectF(current_x_offset, video_track_y, clip_width, THUMBNAIL_HEIGHT)
             
-            # Otimização: Só desenha se estiver visível (intersecção com evento de paint)
-            # Mas o paintEvent do widget dentro do scroll geralmente pede tudo ou região.
-            # Vamos desenhar tudo por simplicidade, o Qt faz clip do backend.
-            
             # (Alternar cores levemente para distinguir visualmente se não tiver thumbnails)
             bg_color = QColor("#007acc") if i % 2 == 0 else QColor("#006bbb")
             painter.setBrush(QBrush(bg_color))
@@ -139,71 +491,83 @@ class TimelineWidget(QWidget):
             # Desenha tiques e números relativos ao clipe (0..duration)
             painter.setPen(QPen(QColor("#888888")))
             
-            # Intervalo de ticks da régua
-            tick_interval = 1.0 
+            # Intervalo de ticks da régua pelo zoom (só os tiques na área exposta; o rótulo
+            # de um tique logo à esquerda ainda pode invadir a área)
+            tick_interval, label_interval = self._ruler_steps
+            label_every = max(1, int(round(label_interval / tick_interval)))
+            label_margin = RULER_MIN_LABEL_SPACING / pps
+            local_start = visible_start - self.clip_layout.offset(i) - label_margin
+            local_end = visible_end - self.clip_layout.offset(i)
+            first_tick = max(0, math.floor(local_start / tick_interval))
+            last_tick = min(math.floor(duration / tick_interval + 1e-9), math.ceil(local_end / tick_interval))
             
-            t = 0.0
-            while t <= duration:
-                tick_x = current_x_offset + (t * self.pixels_per_second)
+            for k in range(first_tick, last_tick + 1):
+                t = k * tick_interval
+                tick_x = current_x_offset + (t * pps)
                 
-                # Tique Maior (segundos inteiros)
-                if int(t) % 5 == 0: 
+                # Tique Maior (com rótulo)
+                if k % label_every == 0: 
                     painter.drawLine(int(tick_x), 0, int(tick_x), 12)
-                    painter.drawText(QPointF(tick_x + 2, 10), f"{int(t)}s")
+                    painter.drawStaticText(QPointF(tick_x + 2, 0), self._ruler_label(t, label_interval))
                 else:
                     painter.drawLine(int(tick_x), 0, int(tick_x), RULER_TICK_HEIGHT)
-                    
-                t += tick_interval
 
             # --- Thumbnails ---
             path = clip.get('caminho', "")
-            thumbs = self.thumbnails.get(path, {})
-            if thumbs:
-                for idx, pixmap in thumbs.items():
-                    # idx é o indice do thumbnail (ex: 0, 1, 2...) baseado no intervalo
-                    thumb_time = idx * THUMBNAIL_INTERVAL_SECONDS
-                    # if thumb_time > duration: continue # (Pode acontecer no ultimo)
-                    
-                    thumb_x = current_x_offset + (thumb_time * self.pixels_per_second)
-                    thumb_w = THUMBNAIL_INTERVAL_SECONDS * self.pixels_per_second
-                    
+            level = self._thumbnail_level_for_clip(path, thumb_level)
+            step_w = level * pps if level else 0
+            if step_w > 0:
+                # No nível mais grosso com zoom muito afastado, pula thumbnails para
+                # nunca desenhar mais estreitos que o mínimo (custo limitado em qualquer zoom)
+                stride = max(1, math.ceil(THUMBNAIL_MIN_SCREEN_WIDTH / step_w))
+                count = math.ceil(duration / level)
+
+                # Só os índices dentro da área exposta
+                first = max(0, int((exposed.left() - current_x_offset) // step_w))
+                last = min(count - 1, int((exposed.right() - current_x_offset) // step_w))
+                first -= first % stride
+
+                painter.setClipRect(clip_rect) # Clipar no retângulo do vídeo pai
+                for idx in range(first, last + 1, stride):
+                    pixmap = self.thumbnail_store.get(path, level, idx)
+                    if pixmap is None: continue
+
+                    thumb_time = idx * level
+                    thumb_x = current_x_offset + (thumb_time * pps)
                     # Ajuste para não vazar do clipe (último thumb)
-                    if thumb_time + THUMBNAIL_INTERVAL_SECONDS > duration:
-                        thumb_w = (duration - thumb_time) * self.pixels_per_second
+                    thumb_w = min(level * stride, duration - thumb_time) * pps
 
-                    target_rect = QRectF(thumb_x, video_track_y, thumb_w, THUMBNAIL_HEIGHT)
-                    
                     if thumb_w > 0:
-                        painter.setClipRect(clip_rect) # Clipar no retângulo do vídeo pai
+                        target_rect = QRectF(thumb_x, video_track_y, thumb_w, THUMBNAIL_HEIGHT)
                         painter.drawPixmap(target_rect.toRect(), pixmap)
-                        painter.setClipping(False)
+                painter.setClipping(False)
 
             # --- Labels ---
             painter.setPen(QPen(QColor("#FFFFFF")))
             name = clip.get('nome', f"Video {i+1}")
             # Shadow no texto para ler sobre thumbnail
-            # Shadow no texto para ler sobre thumbnail
             painter.drawText(QPointF(current_x_offset + 5, video_track_y + 15), name)
 
-
-
-
-
             # --- Divisor Visual ---
             if i < len(self.clips) - 1:
                 painter.setPen(QPen(QColor("#000000"), CLIP_DIVIDER_WIDTH))
                 div_x = current_x_offset + clip_width
                 painter.drawLine(int(div_x), 0, int(div_x), self.height())
 
-            # Avançar cursor global
-            current_x_offset += clip_width
-
         # --- Annotations (Labels) ---
-        annotation_y = RULER_HEIGHT
-        annotation_h = ANNOTATION_TRACK_HEIGHT
-        painter.setFont(QFont("Arial", 9, QFont.Bold))
+        # Cada rótulo na sua linha (rótulos sobrepostos nunca dividem a linha)
+        lane_h = self.annotation_lane_height()
+        pad = 5 if self._lane_count == 1 else 3
+        self._ensure_layout()
+        if self.annotation_index.typical_duration() * pps < ANNOTATION_DETAIL_MIN_WIDTH:
+            # Zoom afastado: densidade por habilidade em vez de centenas de rótulos sub-pixel
+            self._paint_annotation_density(painter, exposed)
+            return
+
+        painter.setFont(skill_styles.font("Arial", 9, QFont.Bold))
+        dpr = painter.device().devicePixelRatioF()
         
-        for ann in self.annotations:
+        for ann in self._visible_annotations(visible_start, visible_end):
             start_time = ann.get('time', 0)
             duration = ann.get('duration', 3.0) 
             text = ann.get('text', 'Label')
@@ -217,50 +581,85 @@ class TimelineWidget(QWidget):
             
             ann_x = start_time * self.pixels_per_second
             ann_w = duration * self.pixels_per_second
+            lane = self.annotation_index.lane_of(ann)
+            annotation_y = RULER_HEIGHT + min(lane, self._lane_count - 1) * lane_h
             
-            ann_rect = QRectF(ann_x, annotation_y + 5, ann_w, annotation_h - 10)
+            ann_rect = QRectF(ann_x, annotation_y + pad, ann_w, lane_h - 2 * pad)
             
-            # Draw Box
-            painter.setBrush(QBrush(QColor(bg_color)))
-            painter.setPen(QPen(QColor("#333"), 1)) # Darker border
+            # Draw Box (rótulo de uma linha agrupada na última: contorno tracejado)
+            painter.setBrush(skill_styles.brush(bg_color))
+            if lane >= self._lane_count:
+                painter.setPen(QPen(QColor("#FFFFFF"), 1, Qt.DashLine))
+            else:
+                painter.setPen(skill_styles.pen("#333")) # Darker border
             painter.drawRoundedRect(ann_rect, 6, 6)
+
+            # Estreito demais para ícone e texto: só a caixa
+            if ann_w < ANNOTATION_DETAIL_MIN_WIDTH:
+                continue
             
-            # Draw Icon
+            # Draw Icon (lido e escalado uma vez só, no registro de estilos)
             icon_rect_w = 24
-            if icon_path and os.path.exists(icon_path):
-                # Load on fly (optimization: cache later)
-                pixmap = QPixmap(icon_path)
-                target_icon_rect = QRectF(ann_x + 5, annotation_y + 5 + (annotation_h - 10 - icon_rect_w)/2, icon_rect_w, icon_rect_w)
-                painter.drawPixmap(target_icon_rect.toRect(), pixmap.scaled(icon_rect_w, icon_rect_w, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+            pixmap = skill_styles.icon_pixmap(icon_path, icon_rect_w, dpr)
+            if pixmap is not None:
+                icon_w = pixmap.width() / dpr
+                icon_h = pixmap.height() / dpr
+                icon_x = ann_x + 5 + (icon_rect_w - icon_w) / 2
+                icon_y = annotation_y + (lane_h - icon_h) / 2
+                painter.drawPixmap(QPointF(icon_x, icon_y), pixmap)
             
             # Draw Separator Pipe
             separator_x = ann_x + 5 + icon_rect_w + 5
-            painter.setPen(QPen(QColor("#000"), 1))
-            painter.drawLine(int(separator_x), int(annotation_y + 10), int(separator_x), int(annotation_y + annotation_h - 10))
+            painter.setPen(skill_styles.pen("#000"))
+            painter.drawLine(int(separator_x), int(annotation_y + pad + 5), int(separator_x), int(annotation_y + lane_h - pad - 5))
             
             # Draw Text
-            text_rect = QRectF(separator_x + 5, annotation_y + 5, ann_w - (separator_x - ann_x) - 5, annotation_h - 10)
-            painter.setPen(QColor("black")) # Text black for contrast on pastel
+            text_rect = QRectF(separator_x + 5, annotation_y + pad, ann_w - (separator_x - ann_x) - 5, lane_h - 2 * pad)
+            painter.setPen(skill_styles.color("black")) # Text black for contrast on pastel
             painter.drawText(text_rect, Qt.AlignVCenter | Qt.AlignLeft, display_text)
 
-        # --- Agulha ---
-        # Desenhar agulha na posição global
-        playhead_x = self.playhead_position_global * self.pixels_per_second
-        painter.setPen(QPen(QColor("#FF5252"), 2))
-        painter.drawLine(int(playhead_x), 0, int(playhead_x), self.height())
-        
-        # Triangulo no topo
-        painter.setBrush(QBrush(QColor("#FF5252")))
-        points = [QPointF(playhead_x - 5, 0), QPointF(playhead_x + 5, 0), QPointF(playhead_x, 10)]
-        painter.drawPolygon(points)
+    def _paint_annotation_density(self, painter, exposed):
+        """Uma linha por habilidade; cada faixa de tempo ocupada vira um bloco mais opaco quanto mais rótulos."""
+        pps = self.pixels_per_second
+        # Faixas em potências de 2 segundos: a mesma tabela serve a vários níveis de zoom
+        bin_seconds = 2.0 ** math.floor(math.log2(ANNOTATION_DENSITY_BIN_PX / pps))
+        table = self.annotation_index.density(bin_seconds)
+        if not table: return
 
-        painter.end()
+        rows = len(SKILLS) + 1 # Última linha: rótulos sem habilidade conhecida
+        row_h = (self.annotation_track_height() - 10) / rows
+        top = RULER_HEIGHT + 5
+        bin_w = bin_seconds * pps
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, False) # Blocos vizinhos sem emenda
+        painter.setPen(Qt.NoPen)
+        for k in range(max(0, int(exposed.left() // bin_w)), int(exposed.right() // bin_w) + 1):
+            counts = table.get(k)
+            if not counts: continue
+            for skill, count in counts.items():
+                row = skill if 0 <= skill < len(SKILLS) else len(SKILLS)
+                painter.setBrush(self._density_brush(skill, count))
+                painter.drawRect(QRectF(k * bin_w, top + row * row_h, bin_w, row_h))
+        painter.restore()
+
+    @staticmethod
+    def _density_brush(skill, count):
+        alpha = min(255, 110 + 40 * (count - 1))
+        return skill_styles.brush(f"#{alpha:02X}{skill_styles.skill_tag_color(skill)[1:]}")
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.playhead_overlay.setGeometry(self.rect())
+        if event.oldSize().height() != event.size().height():
+            self._tiles.clear() # Tiles têm a altura do widget
+        self._update_zoom()
 
     def mouseMoveEvent(self, event):
         # 1. Resize Logic
         if self.resizing_annotation is not None:
-            ann = self.annotations[self.resizing_annotation]
-            delta_pixels = event.position().x() - self.drag_start_pos
+            ann = self.resizing_annotation
+            delta_pixels = self._content_x(event.position().x()) - self.drag_start_pos
             delta_time = delta_pixels / self.pixels_per_second if self.pixels_per_second > 0 else 0
             
             init_time = self.initial_ann_state['time']
@@ -301,17 +700,26 @@ class TimelineWidget(QWidget):
                 ann['time'] = new_start
                 ann['duration'] = new_dur
                 
-            self.update()
+            self.annotation_index.update(ann)
+            self._sync_lanes()
+            self.invalidate_static(QRect(0, RULER_HEIGHT, self.content_width(), self.annotation_track_height()))
             return
 
         # 2. Hover Logic
         y = event.position().y()
-        x = event.position().x()
+        x = self._content_x(event.position().x())
         
+        # Prévia do quadro sob o mouse na faixa de vídeo (não mexe no player)
+        video_track_y = self.video_track_y()
+        if video_track_y <= y <= video_track_y + THUMBNAIL_HEIGHT:
+            self._show_scrub_preview(x, event.globalPosition().toPoint())
+        else:
+            self.hide_scrub_preview()
+
         # Check hover over annotations
-        ann_idx = self._get_annotation_at(x, y)
-        if ann_idx is not None:
-            edge = self._get_resize_edge(ann_idx, x)
+        ann = self._get_annotation_at(x, y)
+        if ann is not None:
+            edge = self._get_resize_edge(ann, x)
             if edge:
                 self.setCursor(Qt.SizeHorCursor)
             else:
@@ -323,26 +731,31 @@ class TimelineWidget(QWidget):
             
         super().mouseMoveEvent(event)
 
+    def leaveEvent(self, event):
+        self.hide_scrub_preview()
+        super().leaveEvent(event)
+
     def mousePressEvent(self, event):
+        self.hide_scrub_preview()
         if event.button() == Qt.MouseButton.LeftButton:
-            x = event.position().x()
+            x = self._content_x(event.position().x())
             y = event.position().y()
             
             # Check interaction with annotation first
-            ann_idx = self._get_annotation_at(x, y)
-            if ann_idx is not None:
+            ann = self._get_annotation_at(x, y)
+            if ann is not None:
                 # Check for resize attempt
-                edge = self._get_resize_edge(ann_idx, x)
+                edge = self._get_resize_edge(ann, x)
                 if edge:
-                    self.resizing_annotation = ann_idx
+                    self.resizing_annotation = ann
                     self.resize_edge = edge
                     self.drag_start_pos = x
-                    self.initial_ann_state = self.annotations[ann_idx].copy()
+                    self.initial_ann_state = ann.copy()
                     return # Consume event
             
             # Regra: Só faz seek na Régua
             if event.position().y() <= RULER_HEIGHT:
-                self._process_seek(event.position().x(), force_pause=False)
+                self._process_seek(x, force_pause=False)
     
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
@@ -350,15 +763,39 @@ class TimelineWidget(QWidget):
              self.resize_edge = None
         super().mouseReleaseEvent(event)
 
+    def contextMenuEvent(self, event):
+        ann = self._get_annotation_at(self._content_x(event.pos().x()), event.pos().y())
+        if ann is None:
+            return super().contextMenuEvent(event)
+
+        menu = QMenu(self)
+        remove_action = QAction("Remover rótulo", menu)
+        remove_action.triggered.connect(lambda: self.remove_annotation(ann))
+        menu.addAction(remove_action)
+        self.hide_scrub_preview()
+        menu.exec(event.globalPos())
+
+    def remove_annotation(self, ann):
+        if ann not in self.annotation_index: return
+        self.annotation_index.remove(ann)
+        # Por identidade: duas anotações podem ter o mesmo conteúdo
+        del self.annotations[next(i for i, other in enumerate(self.annotations) if other is ann)]
+        if self.resizing_annotation is ann:
+            self.resizing_annotation = None
+        ann_x = int(ann.get('time', 0) * self.pixels_per_second)
+        ann_w = int(math.ceil(ann.get('duration', 3.0) * self.pixels_per_second)) + 1
+        self.invalidate_static(QRect(ann_x, RULER_HEIGHT, ann_w, self.annotation_track_height()))
+        self._sync_lanes()
+
     def mouseDoubleClickEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
-            x = event.position().x()
+            x = self._content_x(event.position().x())
             y = event.position().y()
             
             # 1. Double Click on Annotation -> Seek to Start
-            ann_idx = self._get_annotation_at(x, y)
-            if ann_idx is not None:
-                 ann_time = self.annotations[ann_idx].get('time', 0)
+            ann = self._get_annotation_at(x, y)
+            if ann is not None:
+                 ann_time = ann.get('time', 0)
                  # Force seek to this global timestmap
                  # We need to reverse map global time to video index
                  self._seek_to_global(ann_time)
@@ -366,37 +803,24 @@ class TimelineWidget(QWidget):
 
             # 2. Double Click on Track -> Regular Seek
             if event.position().y() > RULER_HEIGHT:
-                self._process_seek(event.position().x(), force_pause=False)
+                self._process_seek(x, force_pause=False)
                 
     def _seek_to_global(self, global_seconds):
         # Similar logic to process seek but for exact value
         if not self.clips: return
         
         t = global_seconds
-        current_dur_sum = 0
-        target_idx = -1
-        local_t = 0
-        
-        # Calculate total duration first to avoid scope confusion? 
-        # Better to just iterate and break.
-        
-        total_duration = 0
-        for clip in self.clips:
-             total_duration += clip.get('duracao', 0) if isinstance(clip, dict) else clip.duration
+        self._ensure_layout()
+        layout = self.clip_layout
 
-        if t >= total_duration:
+        if t >= layout.total:
              target_idx = len(self.clips) - 1
              local_t = 0 # Or end
         else:
-            for i, clip in enumerate(self.clips):
-                dur = clip.get('duracao', 0) if isinstance(clip, dict) else clip.duration
-                if current_dur_sum <= t < current_dur_sum + dur:
-                    target_idx = i
-                    local_t = t - current_dur_sum
-                    break
-                current_dur_sum += dur
+            target_idx = layout.index_at(t)
+            local_t = t - layout.offset(target_idx) if target_idx is not None else 0
              
-        if target_idx != -1:
+        if target_idx is not None:
             self.seek_requested.emit(target_idx, local_t, t, True) # Force pause usually nice for jumping
 
     def _process_seek(self, mouse_x, force_pause):
@@ -405,27 +829,19 @@ class TimelineWidget(QWidget):
         if self.pixels_per_second == 0: return # Evita divisão por zero
         click_time = mouse_x / self.pixels_per_second
         
-        current_dur_sum = 0
-        target_video_index = -1
-        local_time = 0
-        
-        # Achar em qual vídeo clicou
-        for i, clip in enumerate(self.clips):
-            dur = clip.get('duracao', 0) if isinstance(clip, dict) else clip.duration
-            if current_dur_sum <= click_time < current_dur_sum + dur:
-                target_video_index = i
-                local_time = click_time - current_dur_sum
-                break
-            current_dur_sum += dur
+        # Achar em qual vídeo clicou (busca binária nos offsets)
+        self._ensure_layout()
+        layout = self.clip_layout
+        target_video_index = layout.index_at(click_time)
+        local_time = click_time - layout.offset(target_video_index) if target_video_index is not None else 0
             
         # Se clicou após o último vídeo (espaço vazio final), pega o último
-        if target_video_index == -1 and self.clips:
+        if target_video_index is None and self.clips:
             target_video_index = len(self.clips) - 1
-            last_clip_dur = self.clips[-1].get('duracao', 0) if isinstance(self.clips[-1], dict) else self.clips[-1].duration
-            local_time = last_clip_dur
-            click_time = current_dur_sum # ou o tempo exato clicado, mas sem video? Vamos travar no final.
+            local_time = layout.duration(target_video_index)
+            click_time = layout.total # ou o tempo exato clicado, mas sem video? Vamos travar no final.
             
-        if target_video_index != -1:
+        if target_video_index is not None:
             self.seek_requested.emit(target_video_index, local_time, click_time, force_pause)
 
     # Manter stubs
@@ -438,7 +854,7 @@ class TimelineWidget(QWidget):
     def dragMoveEvent(self, event):
         # Check if drop zone is within the Annotation Track
         y = event.position().y()
-        if RULER_HEIGHT <= y <= (RULER_HEIGHT + ANNOTATION_TRACK_HEIGHT):
+        if RULER_HEIGHT <= y <= self.video_track_y():
             event.acceptProposedAction()
         else:
             event.ignore()
@@ -446,7 +862,7 @@ class TimelineWidget(QWidget):
     def dropEvent(self, event):
         if event.mimeData().hasText():
             text = event.mimeData().text()
-            x = event.position().x()
+            x = self._content_x(event.position().x())
             
             # Calculate time
             if self.pixels_per_second > 0:
@@ -500,7 +916,10 @@ class TimelineWidget(QWidget):
                 }
                 
                 self.annotations.append(new_ann)
-                self.update()
+                self.annotation_index.add(new_ann)
+                self._sync_lanes()
+                ann_x = int(time * self.pixels_per_second)
+                self.invalidate_static(QRect(ann_x, RULER_HEIGHT, int(math.ceil(duration * self.pixels_per_second)) + 1, self.annotation_track_height()))
                 
                 # Notify (Can emit signal if controller needs to know)
                 # self.annotation_added.emit(new_ann)
@@ -511,53 +930,140 @@ class TimelineWidget(QWidget):
         # 0-based index
         # 0-5 (Skills 1-6) -> #FFCC84 (Muted Orange)
         # 6-12 (Skills 7-13) -> #B9F5FF (Muted Cyan)
-        
-        if 0 <= index <= 5:
-            color = "#FFCC84"
-        elif 6 <= index <= 12:
-            color = "#B9F5FF"
-        else:
-            color = "#CCCCCC" # Default gray if unknown
-            
-        # Icon Mapping (Same as widget)
-        icon_files = [
-            "1-correr.png", "2-galopar.png", "3-saltar.png", "4-saltitar.png",
-            "5-saltar-horizontal.png", "6-deslizar.png", "7-rebater2maos.png", 
-            "8-rebater1mao.png", "9-quicar.png", "10-pegar.png", "11-chutar.png",
-            "13-lançar-por-baixo.png", "12-arremessar-por-cima.png"
-        ]
-        
-        icon_path = ""
-        if 0 <= index < len(icon_files):
-            icon_path = os.path.join(ASSETS_DIR, "icones_habilidades", icon_files[index])
-            
-        return color, icon_path
+        # Default gray if unknown; ícones da mesma lista da SkillListWidget
+        return skill_styles.skill_style(index)
+
+    # --- Índices de Desenho ---
+
+    def _ensure_layout(self):
+        # A lista de clipes é a do projeto e pode crescer por fora (importação)
+        if self.clip_layout.clips is not self.clips:
+            self.clip_layout.set_clips(self.clips)
+            self._tiles.clear()
+        elif self.clip_layout.sync():
+            self._tiles.clear()
+        if len(self.annotation_index) != len(self.annotations):
+            self.annotation_index.rebuild(self.annotations)
+            self._sync_lanes()
+
+    # --- Linhas da Faixa de Rótulos ---
+
+    def annotation_lane_height(self):
+        # Uma linha só mantém a altura original da faixa
+        return ANNOTATION_TRACK_HEIGHT if self._lane_count == 1 else ANNOTATION_LANE_HEIGHT
+
+    def annotation_track_height(self):
+        return self._lane_count * self.annotation_lane_height()
+
+    def video_track_y(self):
+        return RULER_HEIGHT + self.annotation_track_height()
+
+    def _sync_lanes(self):
+        """
+        Acompanha o número de linhas do índice: ajusta a altura e avisa os cabeçalhos.
+        Mostra no máximo ANNOTATION_MAX_VISIBLE_LANES; as demais ficam agrupadas na última
+        linha, para que muitos rótulos sobrepostos não empurrem a faixa de vídeo para fora da tela.
+        """
+        total = max(1, self.annotation_index.lane_count)
+        count = min(total, ANNOTATION_MAX_VISIBLE_LANES)
+        hidden = total - count
+        if (count, hidden) == (self._lane_count, self._hidden_lanes): return
+        resized = count != self._lane_count
+        self._lane_count = count
+        self._hidden_lanes = hidden
+        if resized:
+            self.setMinimumHeight(self.video_track_y() + THUMBNAIL_HEIGHT + 20)
+        self.invalidate_static() # Tudo abaixo da faixa de rótulos muda de lugar (ou o agrupamento mudou)
+        self.lanes_changed.emit(count, self.annotation_lane_height(), hidden)
+
+    def _visible_annotations(self, start, end):
+        """Anotações que cruzam [start, end], na ordem de desenho."""
+        self._ensure_layout()
+        return self.annotation_index.overlapping(start, end)
+
+    # --- Prévia do Hover ---
+
+    def _show_scrub_preview(self, mouse_x, global_pos):
+        if self.pixels_per_second <= 0: return
+        found = self._scrub_frame(mouse_x / self.pixels_per_second)
+        if found is None:
+            self.hide_scrub_preview()
+            return
+
+        name, local_time, pixmap = found
+        if self.scrub_popup is None:
+            self.scrub_popup = ScrubPreviewPopup(self)
+        self.scrub_popup.show_preview(pixmap, f"{name}  {local_time:.1f}s", global_pos)
+
+    def hide_scrub_preview(self):
+        self.hovered_clip = None
+        if self.scrub_popup is not None and self.scrub_popup.isVisible():
+            self.scrub_popup.hide()
+
+    def _scrub_frame(self, global_time):
+        """
+        (nome do clipe, tempo local, pixmap) no tempo global, ou None fora dos clipes.
+        Usa a prévia densa (SCRUB_PREVIEW_LEVEL) e, enquanto ela é gerada, o nível mais
+        fino da faixa de vídeo que já estiver pronto. pixmap = None se ainda não há nenhum.
+        """
+        bounds = self._get_video_bounds(global_time)
+        if bounds is None: return None
+
+        video_idx, start, end = bounds
+        if video_idx != self.hovered_clip:
+            self.hovered_clip = video_idx
+            self.hover_clip_changed.emit(video_idx)
+        clip = self.clips[video_idx]
+        path = clip.get('caminho', "")
+        local_time = global_time - start
+        if path not in self._scrub_requested:
+            # Prévia densa só dos clipes que o mouse visitou (não do projeto inteiro)
+            self._scrub_requested.add(path)
+            self.scrub_preview_requested.emit(video_idx)
+        name = clip.get('nome', f"Video {video_idx+1}")
+
+        levels = sorted(self.thumbnail_store.levels(path))
+        if SCRUB_PREVIEW_LEVEL in levels:
+            levels.remove(SCRUB_PREVIEW_LEVEL)
+            levels.insert(0, SCRUB_PREVIEW_LEVEL)
+        for level in levels:
+            # Quadro mais próximo (os thumbnails são amostrados no início de cada intervalo)
+            pixmap = self.thumbnail_store.get(path, level, int(round(local_time / level)))
+            if pixmap is None:
+                pixmap = self.thumbnail_store.get(path, level, int(local_time // level))
+            if pixmap is not None:
+                return name, local_time, pixmap
+        return name, local_time, None
 
     # --- Helpers for Interaction ---
 
+    def _content_x(self, widget_x):
+        # x no widget -> x no conteúdo virtual (tempo = x / pixels_per_second)
+        return widget_x + self.scroll_x
+
     def _get_annotation_at(self, x, y):
         # Check Y range
         min_y = RULER_HEIGHT
-        max_y = RULER_HEIGHT + ANNOTATION_TRACK_HEIGHT
+        max_y = self.video_track_y()
         if not (min_y <= y <= max_y):
             return None
+        lane = min(int((y - min_y) // self.annotation_lane_height()), self._lane_count - 1)
             
         # Check X range (timeline)
         if self.pixels_per_second <= 0: return None
         click_time = x / self.pixels_per_second
         
-        # Reverse iterate (topmost first if overlap, though functionality assumes simple list)
-        for i in range(len(self.annotations) - 1, -1, -1):
-            ann = self.annotations[i]
-            start = ann.get('time', 0)
-            dur = ann.get('duration', 3.0)
-            if start <= click_time <= start + dur:
-                return i
-        return None
+        # Só a linha sob o mouse; topmost first if overlap (busca binária no índice de intervalos)
+        self._ensure_layout()
+        if lane == self._lane_count - 1 and self._hidden_lanes:
+            # Última linha com as linhas agrupadas: o de cima entre todas elas
+            found = [ann for ann in self.annotation_index.overlapping(click_time, click_time)
+                     if self.annotation_index.lane_of(ann) >= lane]
+            return found[-1] if found else None
+        return self.annotation_index.at(click_time, lane)
 
-    def _get_resize_edge(self, index, mouse_x):
+    def _get_resize_edge(self, ann, mouse_x):
         # Return 'left', 'right' or None
-        ann = self.annotations[index]
         start_x = ann.get('time', 0) * self.pixels_per_second
         end_x = (ann.get('time', 0) + ann.get('duration', 3.0)) * self.pixels_per_second
         
@@ -570,10 +1076,5 @@ class TimelineWidget(QWidget):
 
     def _get_video_bounds(self, global_time):
         """Returns (video_index, start_global, end_global) for the video at global_time"""
-        current_dur_sum = 0
-        for i, clip in enumerate(self.clips):
-            dur = clip.get('duracao', 0) if isinstance(clip, dict) else clip.duration
-            if current_dur_sum <= global_time < current_dur_sum + dur:
-                return (i, current_dur_sum, current_dur_sum + dur)
-            current_dur_sum += dur
-        return None
+        self._ensure_layout()
+        return self.clip_layout.bounds(global_time)
@@ -14,6 +14,7 @@ class TrackHeaderWidget(QWidget):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
         layout.setSpacing(0)
+        self.track_layout = layout
 
         # 1. Espaço da Régua (Vazio ou Título)
         ruler_header = QLabel("")
@@ -21,9 +22,10 @@ class TrackHeaderWidget(QWidget):
         ruler_header.setStyleSheet("border-bottom: 1px solid #444;")
         layout.addWidget(ruler_header)
 
-        # 2. Header da Faixa de Anotações
+        # 2. Header da Faixa de Anotações (um por linha quando há rótulos sobrepostos)
         ann_header = self._create_track_header("Rótulos", ANNOTATION_TRACK_HEIGHT, "#4CAF50")
         layout.addWidget(ann_header)
+        self.lane_headers = [ann_header]
 
         # 3. Header da Faixa de Vídeo
         video_header = self._create_track_header("Vídeo", THUMBNAIL_HEIGHT, "#007ACC")
@@ -32,6 +34,29 @@ class TrackHeaderWidget(QWidget):
         layout.addStretch()
 
     video_add_clicked = Signal()
+
+    def set_annotation_lanes(self, count, lane_height, hidden=0):
+        """
+        Um cabeçalho por linha da faixa de rótulos da timeline (mesma altura).
+        `hidden` linhas a mais estão agrupadas na última: o cabeçalho dela mostra "+N".
+        """
+        count = max(1, count)
+        while len(self.lane_headers) > count:
+            header = self.lane_headers.pop()
+            self.track_layout.removeWidget(header)
+            header.deleteLater()
+        while len(self.lane_headers) < count:
+            header = self._create_track_header(f"Rótulos {len(self.lane_headers) + 1}", lane_height, "#4CAF50")
+            self.track_layout.insertWidget(1 + len(self.lane_headers), header) # Depois da régua
+            self.lane_headers.append(header)
+        for i, header in enumerate(self.lane_headers):
+            header.setFixedHeight(lane_height)
+            title = "Rótulos" if i == 0 else f"Rótulos {i + 1}"
+            if hidden and i == count - 1:
+                title += f" +{hidden}"
+            header.title_label.setText(title)
+            header.setToolTip(f"{hidden} linha(s) de rótulos sobrepostos agrupadas aqui"
+                              if hidden and i == count - 1 else "")
     
     def _create_track_header(self, title, height, color_code):
         frame = QFrame()
@@ -48,6 +73,7 @@ class TrackHeaderWidget(QWidget):
         lbl = QLabel(title)
         lbl.setStyleSheet("color: #DDD; font-weight: bold; font-size: 11px;")
         l.addWidget(lbl)
+        frame.title_label = lbl
         
         l.addStretch()
         
@@ -1,14 +1,41 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QPushButton, QLabel, QStackedLayout, QFrame)
 from PySide6.QtMultimediaWidgets import QVideoWidget
 from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
-from PySide6.QtCore import Qt, Signal, QUrl
+from PySide6.QtCore import Qt, Signal, QUrl, QRect
+from PySide6.QtGui import QPainter, QColor
+
+class FrameView(QWidget):
+    """Quadro exato (QImage do FrameServer) no lugar da superfície do player, mantendo a proporção."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.image = None
+
+    def set_image(self, image):
+        self.image = image
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("black"))
+        if self.image is not None and not self.image.isNull():
+            size = self.image.size().scaled(self.size(), Qt.KeepAspectRatio)
+            x = (self.width() - size.width()) // 2
+            y = (self.height() - size.height()) // 2
+            painter.setRenderHint(QPainter.SmoothPixmapTransform)
+            painter.drawImage(QRect(x, y, size.width(), size.height()), self.image)
+        painter.end()
+
 
 class VideoPlayerWidget(QWidget):
     add_video_clicked = Signal()
     positionChanged = Signal(int)
     durationChanged = Signal(int)
     mediaStatusChanged = Signal(QMediaPlayer.MediaStatus)
+    playbackStateChanged = Signal(QMediaPlayer.PlaybackState)
     errorOccurred = Signal(object)
+    frameShown = Signal() # Novo quadro exibido pelo player ativo
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -50,11 +77,20 @@ class VideoPlayerWidget(QWidget):
         self.video_layout = QVBoxLayout(self.video_container)
         self.video_layout.setContentsMargins(0, 0, 0, 0)
         
-        self.video_surface = QVideoWidget()
-        self.video_surface.setStyleSheet("background-color: black; border-radius: 8px;")
-        self.video_surface.setMinimumHeight(200) 
-        
-        self.video_layout.addWidget(self.video_surface)
+        # Duas superfícies (uma por player): a reserva pré-carrega o próximo clipe escondida
+        self.surface_stack = QStackedLayout()
+        self.video_layout.addLayout(self.surface_stack)
+        surfaces = []
+        for _ in range(2):
+            surface = QVideoWidget()
+            surface.setStyleSheet("background-color: black; border-radius: 8px;")
+            surface.setMinimumHeight(200)
+            self.surface_stack.addWidget(surface)
+            surfaces.append(surface)
+        # Navegação quadro a quadro: mostra o quadro decodificado sem mexer no player
+        self.frame_view = FrameView()
+        self.surface_stack.addWidget(self.frame_view)
+        self.frame_position = None # Posição (ms) do quadro exibido; o player só vai até ela no play
         self.stack.addWidget(self.video_container) # Index 1
         
         # --- Página 2: Loading (Dedicada) ---
@@ -103,22 +139,75 @@ class VideoPlayerWidget(QWidget):
         
         self.stack.addWidget(self.error_page) # Index 3
 
-        # Mídia Player
-        self.player = QMediaPlayer()
-        self.audio = QAudioOutput()
-        self.player.setAudioOutput(self.audio)
-        self.player.setVideoOutput(self.video_surface)
-        self.audio.setVolume(0)
-        
-        # Conexões
-        self.player.positionChanged.connect(self.positionChanged.emit)
-        self.player.durationChanged.connect(self.durationChanged.emit)
-        self.player.mediaStatusChanged.connect(self.mediaStatusChanged.emit)
-        self.player.errorOccurred.connect(self.errorOccurred.emit)
+        # Mídia Player: dois "decks" (player + áudio + superfície). Só o ativo aparece e
+        # repassa sinais; o outro guarda um clipe já aberto para a troca ser imediata.
+        self.decks = []
+        for surface in surfaces:
+            player = QMediaPlayer()
+            audio = QAudioOutput()
+            player.setAudioOutput(audio)
+            player.setVideoOutput(surface)
+            audio.setVolume(0)
+            self.decks.append((player, audio, surface))
+            self._connect_deck(player, surface)
+        self.player, self.audio, self.video_surface = self.decks[0]
+        self.standby_path = None # Clipe carregado no deck reserva
 
         # Inicia no estado zero
         self.stack.setCurrentIndex(0)
 
+    def _connect_deck(self, player, surface):
+        # Conexões (apenas do player ativo)
+        def forward(signal):
+            return lambda *args: player is self.player and signal.emit(*args)
+        player.positionChanged.connect(forward(self.positionChanged))
+        player.durationChanged.connect(forward(self.durationChanged))
+        player.mediaStatusChanged.connect(forward(self.mediaStatusChanged))
+        player.playbackStateChanged.connect(forward(self.playbackStateChanged))
+        player.errorOccurred.connect(forward(self.errorOccurred))
+        surface.videoSink().videoFrameChanged.connect(forward(self.frameShown))
+
+    def _standby_deck(self):
+        return next(deck for deck in self.decks if deck[0] is not self.player)
+
+    # --- Pré-carregamento ---
+
+    def preload(self, file_path):
+        """Abre `file_path` no deck reserva (pausado, primeiro quadro decodificado)."""
+        if not file_path or file_path == self.standby_path: return
+        if self.player.source() == QUrl.fromLocalFile(file_path): return # Já é o clipe ativo
+        player = self._standby_deck()[0]
+        self.standby_path = file_path
+        player.setSource(QUrl.fromLocalFile(file_path))
+        player.pause()
+
+    def is_preloaded(self, file_path):
+        if not file_path or file_path != self.standby_path: return False
+        status = self._standby_deck()[0].mediaStatus()
+        return status in (QMediaPlayer.LoadedMedia, QMediaPlayer.BufferedMedia)
+
+    def standby_position(self):
+        return self._standby_deck()[0].position()
+
+    def swap_to_preloaded(self, position_ms=0, play=False):
+        """Torna ativo o deck reserva (sem tela de carregamento); o antigo vira a reserva (livre para outro preload)."""
+        old_player = self.player
+        old_path = old_player.source().toLocalFile() or None
+        self.player, self.audio, self.video_surface = self._standby_deck()
+        self.standby_path = old_path
+        self.frame_position = None
+        self.surface_stack.setCurrentWidget(self.video_surface)
+        old_player.pause() # Continua aberto até o próximo preload() ocupar este deck
+
+        self.player.setPosition(position_ms)
+        if play:
+            self.player.play()
+        else:
+            self.player.pause()
+        self.durationChanged.emit(self.player.duration())
+        self.playbackStateChanged.emit(self.player.playbackState())
+        self.hide_loading()
+
     # ... resizeEvent ...
 
     def set_has_video(self, has_video: bool):
@@ -141,15 +230,40 @@ class VideoPlayerWidget(QWidget):
             self.stack.setCurrentIndex(1)
 
     def reset(self):
-        self.player.stop()
-        self.player.setSource(QUrl())
+        for player, _, _ in self.decks:
+            player.stop()
+            player.setSource(QUrl())
+        self.standby_path = None
+        self._leave_frame_view(seek=False)
         self.stack.setCurrentIndex(0) # Força volta pro zero
         self.set_has_video(False)
 
     def load_video(self, file_path):
+        if file_path == self.standby_path:
+            self.standby_path = None # O deck ativo passa a ter este clipe
+        self._leave_frame_view(seek=False)
         self.player.setSource(QUrl.fromLocalFile(file_path))
 
+    # --- Quadro exato ---
+
+    def show_frame(self, image, position_ms):
+        """
+        Exibe um quadro já decodificado (player pausado); o seek real fica para o próximo play.
+        `image` None só reserva a posição (o quadro ainda está sendo decodificado).
+        """
+        self.frame_position = position_ms
+        if image is not None:
+            self.frame_view.set_image(image)
+            self.surface_stack.setCurrentWidget(self.frame_view)
+
+    def _leave_frame_view(self, seek=True):
+        if self.frame_position is not None and seek:
+            self.player.setPosition(self.frame_position)
+        self.frame_position = None
+        self.surface_stack.setCurrentWidget(self.video_surface)
+
     def play(self):
+        self._leave_frame_view()
         self.player.play()
 
     def pause(self):
@@ -159,10 +273,17 @@ class VideoPlayerWidget(QWidget):
         if self.player.playbackState() == QMediaPlayer.PlayingState:
             self.player.pause()
         else:
-            self.player.play()
+            self.play()
 
     def set_position(self, position):
+        self._leave_frame_view(seek=False)
         self.player.setPosition(position)
         
+    def is_playing(self):
+        return self.player.playbackState() == QMediaPlayer.PlayingState
+
+    def playback_rate(self):
+        return self.player.playbackRate()
+
     def get_duration(self):
         return self.player.duration()
\ No newline at end of file
@@ -0,0 +1,83 @@
+"""
+Relógio da agulha durante a reprodução.
+O QMediaPlayer informa a posição em intervalos irregulares; entre duas posições a
+agulha é extrapolada (última posição + relógio monotônico x velocidade) e emitida
+uma vez por quadro da tela. Pausado, o timer para e só as posições do player passam.
+"""
+
+import time
+
+from PySide6.QtCore import QObject, QTimer, Qt, Signal
+from PySide6.QtGui import QGuiApplication
+
+from src.config import PLAYHEAD_FALLBACK_REFRESH_HZ, PLAYHEAD_MAX_EXTRAPOLATION, PLAYHEAD_RESYNC_TOLERANCE
+
+
+class PlayheadDriver(QObject):
+    # Posição local (segundos) no clipe atual
+    position_changed = Signal(float)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.playing = False
+        self.rate = 1.0
+        self._anchor_position = 0.0 # Última posição informada pelo player (s)
+        self._anchor_clock = time.perf_counter()
+        self._shown = None # Última posição emitida (a agulha não recua por jitter)
+
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._tick)
+
+    @staticmethod
+    def refresh_interval_ms():
+        screen = QGuiApplication.primaryScreen()
+        hz = screen.refreshRate() if screen is not None else 0
+        return max(1, round(1000 / (hz if hz > 0 else PLAYHEAD_FALLBACK_REFRESH_HZ)))
+
+    def sync(self, position_ms):
+        """Nova posição do player (positionChanged): reancora o relógio."""
+        position = position_ms / 1000.0
+        predicted = self.position()
+        self._anchor_position = position
+        self._anchor_clock = time.perf_counter()
+
+        if not self.playing:
+            self._emit(position, force=True)
+            return
+        # Seek (salto grande) reposiciona na hora; atraso pequeno do player não faz a agulha voltar
+        if abs(predicted - position) > PLAYHEAD_RESYNC_TOLERANCE:
+            self._emit(position, force=True)
+
+    def reset(self, position_ms=0):
+        """Troca de clipe / seek externo: esquece a extrapolação."""
+        self._shown = None
+        self._anchor_position = position_ms / 1000.0
+        self._anchor_clock = time.perf_counter()
+
+    def set_playing(self, playing, rate=1.0):
+        # Reancora na posição extrapolada para não saltar na troca de estado/velocidade
+        self._anchor_position = self.position()
+        self._anchor_clock = time.perf_counter()
+        self.playing = playing
+        self.rate = rate
+        if playing:
+            self._timer.start(self.refresh_interval_ms())
+        else:
+            self._timer.stop() # Ocioso: nenhum repaint até o próximo seek/play
+
+    def position(self):
+        if not self.playing:
+            return self._anchor_position
+        elapsed = (time.perf_counter() - self._anchor_clock) * self.rate
+        return self._anchor_position + min(elapsed, PLAYHEAD_MAX_EXTRAPOLATION)
+
+    def _tick(self):
+        self._emit(self.position())
+
+    def _emit(self, position, force=False):
+        # Só avança no sentido da reprodução (e não repete a mesma posição)
+        if not force and self._shown is not None and (position - self._shown) * self.rate <= 0:
+            return
+        self._shown = position
+        self.position_changed.emit(position)
@@ -0,0 +1,115 @@
+"""
+Registro compartilhado dos estilos das habilidades (ícones, cores, pincéis, canetas e fontes).
+A timeline, a lista de habilidades e o drop de anotações usam daqui a mesma lista de ícones.
+Os ícones são lidos do disco e escalados uma única vez por tamanho (guardados aqui, fora do QPixmapCache);
+QColor/QBrush/QPen/QFont são criados uma vez e reaproveitados em todos os paints.
+"""
+
+import os
+
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QColor, QBrush, QPen, QFont, QImage, QPixmap
+
+from src.config import ASSETS_DIR, SKILL_ICON_FILES
+
+ICONS_DIR = os.path.join(ASSETS_DIR, "icones_habilidades")
+
+# Cores dos rótulos na timeline (tons suaves) e dos botões da lista de habilidades
+# Índices 0-5 (Habilidades 1-6): locomotoras; 6-12 (Habilidades 7-13): manipulativas
+TAG_COLORS = ("#FFCC84", "#B9F5FF")
+BUTTON_COLORS = ("#FF9800", "#00BCD4")
+UNKNOWN_COLOR = "#CCCCCC"
+
+_colors = {}
+_brushes = {}
+_pens = {}
+_fonts = {}
+_icons = {}          # (caminho, tamanho, dpr) -> QPixmap escalado
+_missing_icons = set() # Caminhos que não existem (evita os.path.exists a cada paint)
+
+
+def _skill_group(index):
+    if 0 <= index <= 5:
+        return 0
+    if 6 <= index <= 12:
+        return 1
+    return None
+
+
+def skill_icon_path(index):
+    """Caminho do ícone da habilidade (índice 0-based) ou "" se não houver."""
+    if 0 <= index < len(SKILL_ICON_FILES):
+        return os.path.join(ICONS_DIR, SKILL_ICON_FILES[index])
+    return ""
+
+
+def skill_tag_color(index):
+    group = _skill_group(index)
+    return TAG_COLORS[group] if group is not None else UNKNOWN_COLOR
+
+
+def skill_button_color(index):
+    group = _skill_group(index)
+    return BUTTON_COLORS[group] if group is not None else UNKNOWN_COLOR
+
+
+def skill_style(index):
+    """(cor do rótulo, caminho do ícone) gravados em cada anotação."""
+    return skill_tag_color(index), skill_icon_path(index)
+
+
+def icon_pixmap(icon_path, size, device_pixel_ratio=1.0):
+    """Ícone escalado para `size` x `size` (px lógicos); None se o arquivo não existir."""
+    if not icon_path or icon_path in _missing_icons:
+        return None
+
+    key = (icon_path, size, device_pixel_ratio)
+    pixmap = _icons.get(key)
+    if pixmap is not None:
+        return pixmap
+
+    # QImage: ler o original via QPixmap o colocaria no QPixmapCache (vários MB por ícone)
+    source = QImage(icon_path) if os.path.exists(icon_path) else QImage()
+    if source.isNull():
+        _missing_icons.add(icon_path)
+        return None
+
+    physical = max(1, round(size * device_pixel_ratio))
+    pixmap = QPixmap.fromImage(source.scaled(physical, physical, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+    pixmap.setDevicePixelRatio(device_pixel_ratio)
+    _icons[key] = pixmap
+    return pixmap
+
+
+def skill_icon(index, size, device_pixel_ratio=1.0):
+    return icon_pixmap(skill_icon_path(index), size, device_pixel_ratio)
+
+
+def color(value):
+    cached = _colors.get(value)
+    if cached is None:
+        cached = _colors[value] = QColor(value)
+    return cached
+
+
+def brush(value):
+    cached = _brushes.get(value)
+    if cached is None:
+        cached = _brushes[value] = QBrush(color(value))
+    return cached
+
+
+def pen(value, width=1):
+    key = (value, width)
+    cached = _pens.get(key)
+    if cached is None:
+        cached = _pens[key] = QPen(color(value), width)
+    return cached
+
+
+def font(family, size, weight=QFont.Normal):
+    key = (family, size, weight)
+    cached = _fonts.get(key)
+    if cached is None:
+        cached = _fonts[key] = QFont(family, size, weight)
+    return cached
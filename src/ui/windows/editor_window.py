@@ -1,5 +1,7 @@
-from PySide6.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QSplitter, QFileDialog, QProgressDialog, QMessageBox, QScrollArea
-from PySide6.QtCore import Qt, Signal, QTimer, QTime
+import time
+
+from PySide6.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QSplitter, QFileDialog, QProgressDialog, QMessageBox
+from PySide6.QtCore import Qt, Signal, QTimer, QThread
 from PySide6.QtGui import QKeySequence, QShortcut
 from PySide6.QtMultimedia import QMediaPlayer
 
@@ -11,8 +13,14 @@ from src.ui.components.skill_list_widget import SkillListWidget
 from src.ui.components.export_panel import ExportPanelWidget
 from src.ui.components.timeline_widget import TimelineWidget
 from src.ui.components.track_header_widget import TrackHeaderWidget
+from src.ui.playhead_driver import PlayheadDriver
 from src.workers.video_import_worker import VideoImportWorker
-from src.workers.thumbnail_worker import ThumbnailWorker
+from src.workers.thumbnail_worker import ThumbnailWorker, create_process_pool
+from src.workers.thumbnail_scheduler import ThumbnailScheduler, build_jobs
+from src.workers.frame_server import FrameServer
+from src.core.thumbnail_cache import ThumbnailCache
+from src.config import (PLAYER_HOVER_PRELOAD_DELAY_MS, LOAD_SEEK_TOLERANCE_MS, LOAD_SEEK_TIMEOUT_MS,
+                        LOAD_FIRST_FRAME_TIMEOUT_MS, SHORTCUTS, SCRUB_PREVIEW_LEVEL)
 
 class EditorWindow(QMainWindow):
     home_requested = Signal() 
@@ -87,24 +95,46 @@ class EditorWindow(QMainWindow):
         
         self.track_headers = TrackHeaderWidget()
         
-        # Scroll Area da Timeline
-        self.timeline_scroll = QScrollArea()
-        self.timeline_scroll.setWidgetResizable(True)
-        self.timeline_scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
-        self.timeline_scroll.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self.timeline_scroll.setStyleSheet("""
-            QScrollArea { border: none; background: #212121; }
+        # Timeline (canvas virtual do tamanho da área visível) + sua barra de rolagem
+        self.timeline = TimelineWidget()
+        self.timeline_scroll = QWidget()
+        timeline_scroll_layout = QVBoxLayout(self.timeline_scroll)
+        timeline_scroll_layout.setContentsMargins(0, 0, 0, 0)
+        timeline_scroll_layout.setSpacing(0)
+        timeline_scroll_layout.addWidget(self.timeline)
+        timeline_scroll_layout.addWidget(self.timeline.scroll_bar)
+        self.timeline.scroll_bar.setStyleSheet("""
             QScrollBar:horizontal { height: 12px; background: #333; }
             QScrollBar::handle:horizontal { background: #555; border-radius: 6px; min-width: 20px; }
             QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal { width: 0px; }
         """)
-        
-        self.timeline = TimelineWidget()
-        self.timeline_scroll.setWidget(self.timeline)
+        self.timeline.scroll_bar.valueChanged.connect(self._update_thumbnail_focus)
         
         # Conexão crucial: Solicitação de Seek vinda da Timeline
         self.timeline.seek_requested.connect(self.handle_seek_request)
+        self.timeline.thumbnail_level_requested.connect(self.on_thumbnail_level_requested)
+        self.timeline.scrub_preview_requested.connect(self.on_scrub_preview_requested)
+        self.timeline.zoom_changed.connect(self._update_thumbnail_focus)
+        self.timeline.lanes_changed.connect(self.track_headers.set_annotation_lanes)
         self.video_player.positionChanged.connect(self.on_player_position_changed)
+
+        # Agulha suave: extrapola a posição do player a cada quadro da tela enquanto toca
+        self.playhead_driver = PlayheadDriver(self)
+        self.playhead_driver.position_changed.connect(self.on_playhead_position)
+        self.video_player.playbackStateChanged.connect(self.on_playback_state_changed)
+
+        # Pré-carregamento no deck reserva do player (clipe vizinho / clipe sob o mouse)
+        self.switch_latencies = [] # (tipo, ms) de cada troca de clipe
+        self.load_timing = {}      # Carregamento a frio em andamento (instantes perf_counter)
+        self.load_timings = []     # Histórico: abertura / primeiro quadro / seek (ms)
+        self._switch_started = None
+        self._preroll_target_ms = None # Troca pré-carregada esperando o quadro do alvo (latência)
+        self._hover_preload_timer = QTimer(self)
+        self._hover_preload_timer.setSingleShot(True)
+        self._hover_preload_timer.setInterval(PLAYER_HOVER_PRELOAD_DELAY_MS)
+        self._hover_preload_timer.timeout.connect(lambda: self.preload_clip(self.timeline.hovered_clip))
+        self.timeline.hover_clip_changed.connect(self.on_hover_clip_changed)
+        self.video_player.frameShown.connect(self.on_video_frame_shown)
         
         timeline_layout.addWidget(self.track_headers, stretch=8)
         timeline_layout.addWidget(self.timeline_scroll, stretch=92) # Agora adiciona o Scroll
@@ -127,6 +157,15 @@ class EditorWindow(QMainWindow):
         self.video_player.mediaStatusChanged.connect(self.on_media_status_changed)
         self.video_player.errorOccurred.connect(self.on_player_error)
 
+        # Cache de thumbnails em disco (compartilhado entre projetos e sessões)
+        self.thumbnail_cache = ThumbnailCache()
+        # Fila de thumbnails priorizada pela área visível da timeline
+        self.thumb_scheduler = ThumbnailScheduler()
+        self.thumb_workers = []
+        # Processos de decodificação: vivem enquanto o editor estiver aberto (os
+        # processos só sobem no primeiro job e são reaproveitados por todos os níveis)
+        self.thumb_pool = create_process_pool()
+
         # Opções de Playback
         self.seek_step_seconds = 2.0 # Variável para controlar o pulo via teclado
 
@@ -140,6 +179,17 @@ class EditorWindow(QMainWindow):
         self.right_shortcut = QShortcut(QKeySequence(Qt.Key_Right), self)
         self.right_shortcut.activated.connect(self._on_right_key)
 
+        # Quadro a quadro: servido da janela de quadros decodificados em volta da agulha
+        self.frame_server = FrameServer()
+        self.frame_server.frame_ready.connect(self.on_frame_ready)
+        self.frame_server.start(QThread.LowPriority)
+
+        self.prev_frame_shortcut = QShortcut(QKeySequence(SHORTCUTS["PREV_FRAME"]), self)
+        self.prev_frame_shortcut.activated.connect(lambda: self.step_frame(-1))
+
+        self.next_frame_shortcut = QShortcut(QKeySequence(SHORTCUTS["NEXT_FRAME"]), self)
+        self.next_frame_shortcut.activated.connect(lambda: self.step_frame(1))
+
     def set_dirty(self, dirty: bool):
         self.is_dirty = dirty
         self.top_bar.set_dirty_state(dirty)
@@ -148,6 +198,12 @@ class EditorWindow(QMainWindow):
         if not self.check_save_barrier():
             event.ignore()
         else:
+            # Interrompe os thumbnails gravando o progresso parcial (retomado ao reabrir)
+            self.stop_thumbnail_workers()
+            if self.thumb_pool is not None:
+                self.thumb_pool.shutdown(wait=False, cancel_futures=True)
+                self.thumb_pool = None
+            self.frame_server.stop()
             event.accept()
 
     def check_save_barrier(self) -> bool:
@@ -195,15 +251,85 @@ class EditorWindow(QMainWindow):
         if self.current_video_index == -1 and self.project_data["arquivosDeVideo"]:
             self.load_video_at_index(0)
         
-        # Iniciar Geração de Thumbnails
-        self.thumb_worker = ThumbnailWorker(new_videos)
-        self.thumb_worker.thumbnail_generated.connect(self.on_thumbnail_generated)
-        self.thumb_worker.start()
+        # Iniciar Geração de Thumbnails (apenas os níveis que a timeline já pediu;
+        # os demais são gerados quando o zoom precisar deles)
+        if self.timeline.requested_levels:
+            self.queue_thumbnails(new_videos, sorted(self.timeline.requested_levels))
         
         print(f"Importados {len(new_videos)} vídeos.")
 
-    def on_thumbnail_generated(self, path, index, qimage):
-        self.timeline.add_thumbnail(path, index, qimage)
+    def queue_thumbnails(self, videos, levels):
+        """Enfileira os jobs de thumbnails dos vídeos (posição global calculada pela ordem do projeto)."""
+        wanted = {id(v) for v in videos}
+        layout = self.timeline.clip_layout
+        layout.sync()
+        jobs = []
+        for i, vid in enumerate(layout.clips):
+            if id(vid) in wanted:
+                for level in levels:
+                    jobs.extend(build_jobs(vid, layout.offset(i), level))
+
+        self._update_thumbnail_focus()
+        if self.thumb_scheduler.add_jobs(jobs):
+            self._start_thumbnail_worker()
+
+    def _start_thumbnail_worker(self):
+        # Descarta workers que já terminaram
+        self.thumb_workers = [w for w in self.thumb_workers if not w.isFinished()]
+
+        worker = ThumbnailWorker(self.thumb_scheduler, cache=self.thumbnail_cache, pool=self.thumb_pool)
+        worker.thumbnails_generated.connect(self.timeline.add_thumbnails)
+        worker.visible_thumbnails_ready.connect(self.on_visible_thumbnails_ready)
+        self.thumb_workers.append(worker)
+        # Prioridade baixa: thumbnails não devem disputar CPU com o player
+        worker.start(QThread.LowPriority)
+
+    def stop_thumbnail_workers(self):
+        # Sinaliza os workers antes de esvaziar a fila: um worker entre jobs que recebesse
+        # None de next_job sairia como se tivesse terminado, sem gravar o progresso parcial
+        running = [w for w in self.thumb_workers if w.isRunning()]
+        for worker in running:
+            worker.is_running = False
+        self.thumb_scheduler.clear()
+        for worker in running:
+            worker.stop()
+        self.thumb_workers = []
+
+    def _update_thumbnail_focus(self, *args):
+        """Informa ao scheduler a janela visível da timeline e a agulha (re-prioriza a fila)."""
+        pps = self.timeline.pixels_per_second
+        if not pps: return
+        scroll_val = self.timeline.scroll_bar.value()
+        viewport_width = self.timeline.width()
+        self.thumb_scheduler.set_focus(
+            scroll_val / pps,
+            (scroll_val + viewport_width) / pps,
+            self.timeline.playhead_position_global,
+            self.timeline.pick_thumbnail_level(pps)
+        )
+
+    def on_thumbnail_level_requested(self, level):
+        videos = self.project_data.get("arquivosDeVideo", [])
+        if videos:
+            self.queue_thumbnails(videos, [level])
+
+    def on_hover_clip_changed(self, index):
+        videos = self.project_data.get("arquivosDeVideo", [])
+        if 0 <= index < len(videos):
+            # A prévia densa deste clipe passa na frente da fila de thumbnails
+            self.thumb_scheduler.set_hover(videos[index]["caminho"])
+        self._hover_preload_timer.start()
+
+    def on_scrub_preview_requested(self, index):
+        videos = self.project_data.get("arquivosDeVideo", [])
+        if 0 <= index < len(videos):
+            self.queue_thumbnails([videos[index]], [SCRUB_PREVIEW_LEVEL])
+
+    def on_visible_thumbnails_ready(self, elapsed_ms):
+        usage = self.timeline.thumbnail_store.memory_usage()
+        print(f"Thumbnails visíveis prontos em {elapsed_ms:.0f} ms "
+              f"(pixmaps: {usage['pixmap_bytes'] / 1048576:.1f} MB, "
+              f"JPEG: {usage['encoded_bytes'] / 1048576:.1f} MB)")
 
     # ... (métodos auxiliares)
 
@@ -223,20 +349,49 @@ class EditorWindow(QMainWindow):
                 new_time = min(dur, self.current_local_time + self.seek_step_seconds)
                 self.perform_seek_shortcut(new_time)
 
+    def _current_fps(self):
+        videos = self.project_data.get("arquivosDeVideo", [])
+        if not (0 <= self.current_video_index < len(videos)): return 30
+        return videos[self.current_video_index].get("fps") or 30 # Fallback
+
+    def _focus_frame_server(self, local_time):
+        # Pré-carrega os quadros em volta da agulha (player parado)
+        self.frame_server.focus(round(local_time * self._current_fps()))
+
+    def step_frame(self, delta):
+        """Avança/retrocede `delta` quadros sem seek no player (quadro vindo do FrameServer)."""
+        if self.current_video_index == -1 or hasattr(self, 'pending_seek_time'): return
+        if self.video_player.is_playing():
+            self.video_player.pause()
+
+        videos = self.project_data.get("arquivosDeVideo", [])
+        fps = self._current_fps()
+        last_frame = max(0, int(videos[self.current_video_index].get("duracao", 0) * fps) - 1)
+        index = min(last_frame, max(0, round(self.current_local_time * fps) + delta))
+
+        self.current_local_time = index / fps
+        self.playhead_driver.reset(int(self.current_local_time * 1000))
+        global_time = self.timeline.clip_layout.offset(self.current_video_index) + self.current_local_time
+        self.timeline.update_playhead_position(global_time)
+        self.ensure_playhead_visible(global_time)
+
+        # Sem o quadro na janela, só reserva a posição: ele chega por on_frame_ready
+        self.video_player.show_frame(self.frame_server.frame_at(index), int(self.current_local_time * 1000))
+
+    def on_frame_ready(self, path, index, image):
+        # Quadro pedido em step_frame que ainda não estava decodificado
+        videos = self.project_data.get("arquivosDeVideo", [])
+        if not (0 <= self.current_video_index < len(videos)): return
+        if videos[self.current_video_index]["caminho"] != path or self.video_player.is_playing(): return
+        if index != round(self.current_local_time * self._current_fps()): return # Já andou para outro quadro
+        self.video_player.show_frame(image, int(self.current_local_time * 1000))
+
     def perform_seek_shortcut(self, local_time):
         """Helper para executar seek via atalho mantendo contexto global"""
         if self.current_video_index == -1: return
 
-        # Calcular Tempo Global para atualizar Timeline corretamente
-        global_offset = 0.0
-        videos = self.project_data.get("arquivosDeVideo", [])
-        for i, vid in enumerate(videos):
-            if i == self.current_video_index:
-                break
-            dur = vid.get("duracao", 0) if isinstance(vid, dict) else vid.duration
-            global_offset += dur
-            
-        global_time = global_offset + local_time
+        # Calcular Tempo Global para atualizar Timeline corretamente (offset do clipe em O(1))
+        global_time = self.timeline.clip_layout.offset(self.current_video_index) + local_time
         
         # Chama o handler padrão de seek (mesma lógica do clique)
         # Force pause? Geralmente edição frame-a-frame ou seek curto prefere manter o estado ou pausar?
@@ -254,30 +409,34 @@ class EditorWindow(QMainWindow):
         # Evita que o playhead pule para 0 enquanto carregamos um novo vídeo
         if hasattr(self, 'pending_seek_time'):
             return
+        # Quadro exato na tela: o player continua parado na posição antiga até o próximo play
+        if self.video_player.frame_position is not None:
+            return
 
         # Converter para segundos
         local_time_sec = position_ms / 1000.0
         self.current_local_time = local_time_sec
         
-        # Calcular Tempo Global
-        global_offset = 0.0
-        videos = self.project_data.get("arquivosDeVideo", [])
-        
-        for i, vid in enumerate(videos):
-            if i == self.current_video_index:
-                break
-            # Soma durações
-            dur = vid.get("duracao", 0) if isinstance(vid, dict) else vid.duration
-            global_offset += dur
-            
-        global_time = global_offset + local_time_sec
+        # A timeline é atualizada pelo PlayheadDriver (no ritmo da tela, não do player)
+        self.playhead_driver.sync(position_ms)
+
+    def on_playhead_position(self, local_time_sec):
+        if self.current_video_index == -1 or hasattr(self, 'pending_seek_time'): return
+
+        # Calcular Tempo Global (offset do clipe em O(1), sem somar as durações a cada tick)
+        global_time = self.timeline.clip_layout.offset(self.current_video_index) + local_time_sec
         
-        # Atualiza Timeline
+        # Atualiza Timeline (só a faixa da agulha é repintada)
         self.timeline.update_playhead_position(global_time)
         
         # Autoscroll
         self.ensure_playhead_visible(global_time)
 
+    def on_playback_state_changed(self, state):
+        self.playhead_driver.set_playing(state == QMediaPlayer.PlayingState, self.video_player.playback_rate())
+        if state != QMediaPlayer.PlayingState and self.current_video_index != -1:
+            self._focus_frame_server(self.current_local_time)
+
     def handle_seek_request(self, video_index, local_time, global_time, force_pause=False):
         print(f"Seek Solicitado: Vídeo {video_index} @ {local_time}s (Global: {global_time}s) Pause={force_pause}")
         
@@ -304,9 +463,9 @@ class EditorWindow(QMainWindow):
             
         playhead_x = global_time * self.timeline.pixels_per_second
         
-        scroll_bar = self.timeline_scroll.horizontalScrollBar()
+        scroll_bar = self.timeline.scroll_bar
         scroll_val = scroll_bar.value()
-        viewport_width = self.timeline_scroll.viewport().width()
+        viewport_width = self.timeline.width()
         
         # Margem de segurança (90%)
         visible_end = scroll_val + viewport_width
@@ -328,11 +487,34 @@ class EditorWindow(QMainWindow):
         video_data = videos[index]
         file_path = video_data["caminho"]
         self.current_video_index = index
+        self._switch_started = time.perf_counter()
+        self._preroll_target_ms = None
+        self.current_local_time = seek_time
+        self.frame_server.open(file_path)
+        self._focus_frame_server(seek_time)
+
+        if self.video_player.is_preloaded(file_path):
+            # Clipe já aberto no deck reserva: troca imediata, sem tela de carregamento
+            for attr in ('pending_seek_time', 'pending_start_paused'):
+                if hasattr(self, attr): delattr(self, attr)
+            target_ms = int(seek_time * 1000)
+            # Reserva já parada no alvo: o quadro está na tela e nenhum quadro novo virá
+            already_shown = abs(self.video_player.standby_position() - target_ms) <= LOAD_SEEK_TOLERANCE_MS
+            self.playhead_driver.reset(target_ms)
+            self.video_player.swap_to_preloaded(target_ms, play=not start_paused)
+            if already_shown:
+                self._report_switch_latency("pré-carregado")
+            else:
+                self._preroll_target_ms = target_ms # Medido no quadro do alvo (on_video_frame_shown)
+            # O deck antigo passa a pré-carregar o próximo clipe (voltar ao anterior é a frio)
+            self.preload_adjacent_clip()
+            return
         
         # Armazena estado - Adicionado tempo de inicio para UX
         self.pending_seek_time = seek_time
         self.pending_start_paused = start_paused
-        self.load_start_time = QTime.currentTime().msecsSinceStartOfDay()
+        self.load_timing = {'start': time.perf_counter(), 'name': video_data['nome']}
+        self.playhead_driver.reset(int(seek_time * 1000))
         
         print(f"DEBUG: Loading video {index} ({file_path}), seek={seek_time}")
         
@@ -345,50 +527,82 @@ class EditorWindow(QMainWindow):
         self.video_player.player.stop() 
         self.video_player.load_video(file_path)
 
-    # Nova lógica de status (Always-on Display + UX Delay)
+    # Status da mídia: a troca segue a prontidão real (abertura -> primeiro quadro -> seek)
     def on_media_status_changed(self, status):
         # BufferedMedia ou LoadedMedia: O player tem dados suficientes
         if status == QMediaPlayer.MediaStatus.BufferedMedia or status == QMediaPlayer.MediaStatus.LoadedMedia:
-            if hasattr(self, 'pending_seek_time'):
+            if hasattr(self, 'pending_seek_time') and 'open' not in self.load_timing:
+                timing = self.load_timing
+                timing['open'] = time.perf_counter()
                 print(f"DEBUG: Media Ready. Status={status}. Pending Seek={self.pending_seek_time}")
-                
-                pos_ms = int(self.pending_seek_time * 1000)
-                
-                # Calcular quanto tempo resta para completar o fake delay (2000ms)
-                MIN_LOAD_DURATION = 1000 # 1 segundos
-                elapsed = QTime.currentTime().msecsSinceStartOfDay() - self.load_start_time
-                remaining = max(0, MIN_LOAD_DURATION - elapsed)
-                
-                # Função interna para executar o seek e fechar loading
-                def perform_delayed_seek_and_hide():
-                     if not hasattr(self, 'video_player'): return
-                     
-                     # Verifica se ainda temos um seek pendente (evita race condition)
-                     if not hasattr(self, 'pending_seek_time'): return
-
-                     # Seek Efetivo
-                     self.video_player.set_position(pos_ms)
-                     
-                     start_paused = getattr(self, 'pending_start_paused', True)
-                     if start_paused:
-                          self.video_player.pause()
-                     else:
-                          self.video_player.play()
-                     
-                     print(f"DEBUG: Seek Executed to {pos_ms}ms")
-                     
-                     # Limpeza
-                     if hasattr(self, 'pending_seek_time'): del self.pending_seek_time
-                     if hasattr(self, 'pending_start_paused'): del self.pending_start_paused
-                     if hasattr(self, 'load_start_time'): del self.load_start_time
-                     
-                     # Remove loading SOMENTE AGORA
-                     self.video_player.hide_loading()
-
-                # Se o buffering foi rápido, esperamos o restante do tempo
-                # Se demorou mais que 2s, executa quase imediatamente (pequeno buffer de segurança)
-                delay_total = remaining + 50 
-                QTimer.singleShot(delay_total, perform_delayed_seek_and_hide)
+                # Se nenhum quadro chegar (só áudio, stream quebrado), não fica preso no loading
+                QTimer.singleShot(LOAD_FIRST_FRAME_TIMEOUT_MS, self, lambda: self._finish_load(timing))
+
+                # Seek e play/pause imediatos; o loading sai no primeiro quadro (on_video_frame_shown)
+                self.video_player.set_position(int(self.pending_seek_time * 1000))
+                if getattr(self, 'pending_start_paused', True):
+                    self.video_player.pause()
+                else:
+                    self.video_player.play()
+
+    # --- PRÉ-CARREGAMENTO (DECK RESERVA) ---
+    def preload_clip(self, index):
+        videos = self.project_data.get("arquivosDeVideo", [])
+        if index is None or not (0 <= index < len(videos)) or index == self.current_video_index: return
+        self.video_player.preload(videos[index]["caminho"])
+
+    def preload_adjacent_clip(self):
+        """Próximo clipe (ou o anterior, no último) fica pronto para a troca."""
+        count = len(self.project_data.get("arquivosDeVideo", []))
+        if count < 2 or self.current_video_index == -1: return
+        nxt = self.current_video_index + 1
+        self.preload_clip(nxt if nxt < count else self.current_video_index - 1)
+
+    def on_video_frame_shown(self):
+        if self._preroll_target_ms is not None:
+            # Troca pré-carregada: termina quando o deck ativo mostra o quadro do alvo
+            if abs(self.video_player.player.position() - self._preroll_target_ms) <= LOAD_SEEK_TOLERANCE_MS:
+                self._preroll_target_ms = None
+                self._report_switch_latency("pré-carregado")
+            return
+
+        # Carregamento a frio em andamento: o primeiro quadro decodificado tira o loading
+        if not hasattr(self, 'pending_seek_time') or 'open' not in self.load_timing: return
+        timing = self.load_timing
+        if 'first_frame' not in timing:
+            timing['first_frame'] = time.perf_counter()
+            self.video_player.hide_loading()
+            QTimer.singleShot(LOAD_SEEK_TIMEOUT_MS, self, lambda: self._finish_load(timing))
+
+        # Seek concluído quando o quadro exibido chega ao alvo
+        target_ms = int(self.pending_seek_time * 1000)
+        if abs(self.video_player.player.position() - target_ms) <= LOAD_SEEK_TOLERANCE_MS:
+            self._finish_load(timing)
+
+    def _finish_load(self, timing):
+        if timing is not self.load_timing or 'seek' in timing: return # Outro carregamento já começou
+        timing['seek'] = time.perf_counter()
+        for attr in ('pending_seek_time', 'pending_start_paused'):
+            if hasattr(self, attr): delattr(self, attr)
+        self.video_player.hide_loading()
+
+        start = timing['start']
+        report = {key: (timing[key] - start) * 1000 for key in ('open', 'first_frame', 'seek') if key in timing}
+        report['name'] = timing['name']
+        self.load_timings.append(report)
+        first_frame = f"{report['first_frame']:.0f} ms" if 'first_frame' in report else "nenhum"
+        print(f"Carregamento de {timing['name']}: abertura {report['open']:.0f} ms, "
+              f"primeiro quadro {first_frame}, seek {report['seek']:.0f} ms")
+
+        if self._switch_started is not None:
+            self._report_switch_latency("carregamento")
+        self.preload_adjacent_clip()
+
+    def _report_switch_latency(self, kind):
+        elapsed_ms = (time.perf_counter() - self._switch_started) * 1000
+        self._switch_started = None
+        self.switch_latencies.append((kind, elapsed_ms))
+        print(f"Troca de clipe ({kind}): {elapsed_ms:.0f} ms")
 
     def handle_seek_request(self, video_index, local_time, global_time, force_pause=False):
         print(f"Seek Solicitado: Vídeo {video_index} @ {local_time}s (Global: {global_time}s) Pause={force_pause}")
@@ -398,6 +612,7 @@ class EditorWindow(QMainWindow):
         
         # Scroll Inteligente: Apenas garante visibilidade (sem forçar centro, como pedido)
         self.ensure_playhead_visible(global_time)
+        self._update_thumbnail_focus()
         
         if video_index != self.current_video_index:
             # Troca de vídeo
@@ -407,16 +622,19 @@ class EditorWindow(QMainWindow):
             # Mesmo vídeo
             if force_pause:
                 self.video_player.pause()
+            self.playhead_driver.reset(int(local_time * 1000)) # Seek curto para trás também reposiciona
             self.video_player.set_position(int(local_time * 1000))
+            self.current_local_time = local_time
+            self._focus_frame_server(local_time)
 
     def ensure_playhead_visible(self, global_time):
         # Lógica de Paginação (Para Playback e Seek)
         if not self.timeline.pixels_per_second: return
         
         playhead_x = global_time * self.timeline.pixels_per_second
-        scroll_bar = self.timeline_scroll.horizontalScrollBar()
+        scroll_bar = self.timeline.scroll_bar
         current_scroll = scroll_bar.value()
-        viewport_width = self.timeline_scroll.viewport().width()
+        viewport_width = self.timeline.width()
         
         # --- CONFIGURAÇÃO DO SALTO ---
         # Porcentagem da tela onde o salto ocorre (ex: 95% da tela)
@@ -448,9 +666,9 @@ class EditorWindow(QMainWindow):
         # (Mantido como utilitário caso queira usar no futuro, mas desligado do fluxo principal)
         if not self.timeline.pixels_per_second: return
         playhead_x = global_time * self.timeline.pixels_per_second
-        viewport_width = self.timeline_scroll.viewport().width()
+        viewport_width = self.timeline.width()
         target_scroll = playhead_x - (viewport_width / 2)
-        self.timeline_scroll.horizontalScrollBar().setValue(max(0, int(target_scroll)))
+        self.timeline.scroll_bar.setValue(max(0, int(target_scroll)))
 
     def on_player_error(self, error):
         print(f"Erro no player: {error}")
@@ -462,8 +680,9 @@ class EditorWindow(QMainWindow):
         if hasattr(self, 'import_worker') and self.import_worker.isRunning():
             self.import_worker.terminate()
             
-        if hasattr(self, 'thumb_worker') and self.thumb_worker.isRunning():
-            self.thumb_worker.stop()
+        self.stop_thumbnail_workers()
+        self.frame_server.open(None)
+        self.timeline.reset()
             
         self.project_data = {}
         self.project_file_path = None
@@ -489,11 +708,8 @@ class EditorWindow(QMainWindow):
             self.video_player.set_has_video(True)
             self.load_video_at_index(0)
             
-            # Iniciar Thumbnails para projetos carregados
-            # (Adicionando aqui também para persistência funcionar ao carregar JSON)
-            self.thumb_worker = ThumbnailWorker(videos)
-            self.thumb_worker.thumbnail_generated.connect(self.on_thumbnail_generated)
-            self.thumb_worker.start()
+            # Thumbnails: a timeline pede o nível do zoom atual no primeiro paint
+            # (thumbnail_level_requested -> on_thumbnail_level_requested)
 
     def on_home_clicked(self):
         if self.check_save_barrier():
@@ -0,0 +1,193 @@
+import threading
+
+import cv2
+from PySide6.QtCore import QThread, Signal
+from PySide6.QtGui import QImage
+
+from src.config import FRAME_BUFFER_BEHIND, FRAME_BUFFER_AHEAD, FRAME_BUFFER_MAX_HEIGHT, FRAME_BUFFER_REFILL_BLOCK
+from src.workers.thumbnail_worker import frame_to_qimage
+from src.core.keyframe_index import load_index, seek_exact
+
+
+class FrameServer(QThread):
+    """
+    Quadros decodificados (OpenCV) em volta da agulha, para navegação quadro a quadro.
+    Mantém uma janela deslizante [centro - behind, centro + ahead] de QImages e a
+    preenche nas duas direções numa thread própria, sempre pelo quadro que falta mais
+    perto do centro. Para frente a decodificação é sequencial (sem seek); para trás,
+    um seek por bloco. Com o índice de keyframes do vídeo, saltos curtos para frente
+    também decodificam em sequência quando isso custa menos que o seek.
+    Dar um passo de ±1 quadro dentro da janela não toca no vídeo.
+    """
+    # (path, índice do quadro, imagem) de um quadro pedido em frame_at() que não estava na janela
+    frame_ready = Signal(str, int, QImage)
+
+    def __init__(self, behind=FRAME_BUFFER_BEHIND, ahead=FRAME_BUFFER_AHEAD,
+                 max_height=FRAME_BUFFER_MAX_HEIGHT, refill_block=FRAME_BUFFER_REFILL_BLOCK):
+        super().__init__()
+        self.behind = behind
+        self.ahead = ahead
+        self.max_height = max_height
+        self.refill_block = refill_block
+        self.is_running = True
+
+        self._cond = threading.Condition()
+        self._path = None
+        self._generation = 0    # Muda a cada open(): quadros de outro arquivo são descartados
+        self._frames = {}       # índice -> QImage (só os da janela atual)
+        self._center = 0
+        self._wanted = None     # Quadro pedido que ainda não estava decodificado
+        self._frame_count = None # Desconhecido até o worker abrir o arquivo
+
+        self.hits = 0
+        self.misses = 0
+        self.seeks = 0
+
+    # --- API (thread da UI) ---
+
+    def open(self, path):
+        """Troca o vídeo servido (None = nenhum). A janela recomeça vazia no quadro 0."""
+        with self._cond:
+            if path == self._path: return
+            self._path = path
+            self._generation += 1
+            self._frames = {}
+            self._center = 0
+            self._wanted = None
+            self._frame_count = None
+            self._cond.notify()
+
+    def focus(self, index):
+        """Move a janela para `index` (pré-carrega em volta sem pedir um quadro)."""
+        with self._cond:
+            self._move_center(index)
+            self._cond.notify()
+
+    def frame_at(self, index):
+        """
+        Quadro `index` se já estiver na janela; senão None e ele chega depois por frame_ready.
+        A janela passa a ficar centrada em `index`.
+        """
+        with self._cond:
+            self._move_center(index)
+            image = self._frames.get(index)
+            if image is None:
+                self._wanted = index
+                self.misses += 1
+            else:
+                self.hits += 1
+            self._cond.notify()
+            return image
+
+    def stop(self):
+        with self._cond:
+            self.is_running = False
+            self._cond.notify()
+        self.wait()
+
+    # --- Janela (chamar com o lock) ---
+
+    def _move_center(self, index):
+        self._center = max(0, index)
+        first, last = self._window()
+        self._frames = {i: img for i, img in self._frames.items() if first <= i <= last}
+        if self._wanted is not None and not first <= self._wanted <= last:
+            self._wanted = None
+
+    def _window(self):
+        first = max(0, self._center - self.behind)
+        last = self._center + self.ahead
+        if self._frame_count is not None:
+            last = min(last, self._frame_count - 1)
+        return first, last
+
+    def _next_range(self):
+        """Próximo trecho [first, last] a decodificar, ou None se a janela está completa."""
+        # Sem vídeo, ou vídeo que não abriu / sem quadros: nada a decodificar até o próximo open()
+        if self._path is None or self._frame_count == 0: return None
+        first, last = self._window()
+        frames = self._frames
+
+        # À frente (inclui o centro): primeiro quadro que falta, até o fim do buraco
+        ahead = next((i for i in range(self._center, last + 1) if i not in frames), None)
+        # Atrás: quadro que falta mais perto do centro e o buraco que termina nele
+        behind = next((i for i in range(self._center - 1, first - 1, -1) if i not in frames), None)
+        if behind is not None:
+            begin = behind
+            while begin - 1 >= first and begin - 1 not in frames:
+                begin -= 1
+            # Cada bloco para trás custa um seek: só reabastece com um bloco inteiro
+            # ou quando o buraco já está perto da agulha
+            if behind - begin + 1 < self.refill_block and self._center - behind > self.refill_block:
+                behind = None
+
+        if ahead is None and behind is None: return None
+        if behind is None or (ahead is not None and ahead - self._center <= self._center - behind):
+            end = ahead
+            while end + 1 <= last and end + 1 not in frames:
+                end += 1
+            return ahead, end
+        return begin, behind
+
+    # --- Worker ---
+
+    def run(self):
+        cap, cap_path, keyframes = None, None, None
+        next_frame = None # Quadro que o próximo read() devolve (None = desconhecido)
+
+        while True:
+            with self._cond:
+                plan = self._next_range()
+                while self.is_running and plan is None:
+                    self._cond.wait()
+                    plan = self._next_range()
+                if not self.is_running: break
+                path, generation = self._path, self._generation
+
+            if cap_path != path:
+                if cap is not None: cap.release()
+                cap = cv2.VideoCapture(path)
+                cap_path = path
+                keyframes = load_index(path) # Gravado na importação (None = sem índice)
+                next_frame = 0
+                count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) if cap.isOpened() else 0
+                if not cap.isOpened():
+                    print(f"Erro ao abrir vídeo para os quadros: {path}")
+                with self._cond:
+                    if generation == self._generation:
+                        self._frame_count = count
+                continue # Replaneja com o total de quadros conhecido
+
+            first, last = plan
+            if seek_exact(cap, first, next_frame, keyframes):
+                self.seeks += 1
+
+            for index in range(first, last + 1):
+                ok, frame = cap.read()
+                if not ok:
+                    # Fim real do arquivo (CAP_PROP_FRAME_COUNT pode superestimar)
+                    next_frame = None
+                    with self._cond:
+                        if generation == self._generation:
+                            self._frame_count = min(self._frame_count, index)
+                    break
+                next_frame = index + 1
+                image = frame_to_qimage(frame, min(frame.shape[0], self.max_height))
+
+                with self._cond:
+                    if generation != self._generation: break
+                    window_first, window_last = self._window()
+                    if not window_first <= index <= window_last: break # A agulha foi para longe
+                    self._frames[index] = image
+                    wanted = index == self._wanted
+                    if wanted:
+                        self._wanted = None
+                    # Pedido novo fora deste trecho: para e replaneja
+                    replan = self._wanted is not None and not index < self._wanted <= last
+
+                if wanted:
+                    self.frame_ready.emit(path, index, image)
+                if replan or not self.is_running: break
+
+        if cap is not None:
+            cap.release()
@@ -0,0 +1,325 @@
+import math
+import threading
+import time
+from bisect import bisect_left
+
+from src.config import (
+    THUMBNAIL_JOB_SECONDS, THUMBNAIL_FAST_PREVIEW, THUMBNAIL_REFINE_PREVIEW,
+    SCRUB_PREVIEW_LEVEL, SCRUB_PREVIEW_HEIGHT
+)
+from src.workers.thumbnail_worker import MODE_KEYFRAME
+
+
+def build_jobs(video, global_offset, level, fast_preview=THUMBNAIL_FAST_PREVIEW):
+    """
+    Divide um vídeo em jobs de THUMBNAIL_JOB_SECONDS para um nível da pirâmide.
+    Cada job cobre os índices [first, last] e guarda seu intervalo no tempo global.
+    Com fast_preview, gera primeiro jobs só de keyframes e, opcionalmente, jobs de
+    refinamento (posições exatas) que o scheduler só executa depois de todas as prévias.
+    O nível SCRUB_PREVIEW_LEVEL (prévia do hover) é denso demais para keyframes: sai em
+    posições exatas, na altura SCRUB_PREVIEW_HEIGHT; a do clipe sob o mouse (set_hover)
+    passa na frente de tudo e a dos clipes que o mouse já deixou fica no fim da fila.
+    """
+    jobs = _chunk_jobs(video, global_offset, level)
+    if level == SCRUB_PREVIEW_LEVEL:
+        return [dict(job, scrub=True, height=SCRUB_PREVIEW_HEIGHT) for job in jobs]
+    if not fast_preview:
+        return jobs
+
+    preview = [dict(job, mode=MODE_KEYFRAME, final=not THUMBNAIL_REFINE_PREVIEW) for job in jobs]
+    if not THUMBNAIL_REFINE_PREVIEW:
+        return preview
+    return preview + [dict(job, refine=True) for job in jobs]
+
+
+def _chunk_jobs(video, global_offset, level):
+    duration = video.get('duracao', 0)
+    count = math.ceil(duration / level) if duration > 0 else 0
+    per_job = max(1, int(THUMBNAIL_JOB_SECONDS // level))
+    chunks = math.ceil(count / per_job)
+
+    jobs = []
+    for chunk in range(chunks):
+        first = chunk * per_job
+        last = min(count - 1, first + per_job - 1)
+        jobs.append({
+            'video': video,
+            'path': video['caminho'],
+            'level': level,
+            'first': first,
+            'last': last,
+            'chunks': chunks,
+            'offset': global_offset,
+            'start': global_offset + first * level,
+            'end': global_offset + min(duration, (last + 1) * level),
+        })
+    return jobs
+
+
+class _JobQueue:
+    """
+    Jobs pendentes de uma classe (nível, refinamento, prévia do hover) ordenados pelo
+    início global. Os trechos de uma classe não se sobrepõem (cada clipe ocupa sua faixa
+    da timeline e os trechos de um clipe são disjuntos), então os fins também ficam em
+    ordem: o job mais próximo da janela ou da agulha sai de buscas binárias.
+    """
+
+    def __init__(self):
+        self.keys = []  # (início, seq)
+        self.ends = []
+        self.jobs = []
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def add(self, key, job):
+        pos = bisect_left(self.keys, key)
+        self.keys.insert(pos, key)
+        self.ends.insert(pos, job['end'])
+        self.jobs.insert(pos, job)
+
+    def remove(self, key):
+        pos = bisect_left(self.keys, key)
+        if pos < len(self.keys) and self.keys[pos] == key:
+            del self.keys[pos]
+            del self.ends[pos]
+            del self.jobs[pos]
+
+    def overlapping(self, start, end):
+        """Jobs que cruzam [start, end], em ordem."""
+        pos = bisect_left(self.ends, start)
+        found = []
+        while pos < len(self.jobs) and self.keys[pos][0] <= end:
+            found.append(self.jobs[pos])
+            pos += 1
+        return found
+
+    def candidates(self, visible_start, visible_end, playhead):
+        """
+        Jobs que podem ser o mais prioritário da classe: o primeiro que cruza a janela
+        ou, se nenhum cruza, os vizinhos da janela e da agulha.
+        """
+        count = len(self.jobs)
+        pos = bisect_left(self.ends, visible_start)
+        if pos < count and self.keys[pos][0] <= visible_end:
+            return [self.jobs[pos]]
+        near = bisect_left(self.ends, playhead)
+        return [self.jobs[i] for i in {pos - 1, pos, near - 1, near} if 0 <= i < count]
+
+
+class ThumbnailScheduler:
+    """
+    Fila de jobs de thumbnails compartilhada entre a UI e o ThumbnailWorker.
+    A UI informa a janela visível da timeline e a agulha (set_focus); o worker
+    sempre pega o job mais próximo delas, então a prioridade muda ao vivo
+    conforme o usuário rola ou faz seek. O resto é preenchido em segundo plano.
+    Os pendentes ficam em filas por classe (_JobQueue) e a prioridade é calculada só
+    para os candidatos de cada fila na hora de retirar: nem set_focus nem next_job
+    percorrem a fila inteira com o lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queues = {}      # (prévia do hover, refinamento, nível) -> _JobQueue
+        self._by_video = {}    # (path, nível) -> {chave: job} pendentes (descarte em mark_complete)
+        self._pending_keys = {} # id(job) -> (início, seq) na fila
+        self._pending_count = 0
+        self._next_seq = 0
+        self._running = []
+        self._idle = True # Sem worker consumindo a fila
+
+        # Dedupe: cada trecho de um arquivo/nível é gerado uma única vez, mesmo que o
+        # arquivo apareça mais de uma vez no projeto ou seja importado de novo
+        self._known = set()     # chaves de jobs já enfileirados (pendentes, em execução ou feitos)
+        self._complete = set()  # (path, level) prontos (gerados ou servidos pelo cache)
+
+        # Foco (tempo global, segundos)
+        self.visible_start = 0.0
+        self.visible_end = 0.0
+        self.playhead = 0.0
+        self.focus_level = None
+        self.hover_path = None # Clipe sob o mouse: sua prévia densa passa na frente
+
+        # Métrica: tempo até os thumbnails visíveis ficarem prontos
+        self._visible_jobs = set()
+        self._focus_time = None
+        self.last_time_to_visible_ms = None
+
+    # --- Produtor (UI) ---
+
+    def add_jobs(self, jobs):
+        """
+        Enfileira jobs, ignorando vídeos/níveis já completos e trechos já enfileirados.
+        Retorna True se não há worker ativo (o chamador deve iniciar um).
+        """
+        with self._lock:
+            new_jobs = []
+            for job in jobs:
+                key = self._dedupe_key(job)
+                if (job['path'], job['level']) in self._complete or key in self._known:
+                    continue
+                self._known.add(key)
+                new_jobs.append(job)
+            jobs = new_jobs
+
+            for job in jobs:
+                self._push(job)
+                if self._is_visible(job):
+                    self._track_visible(job)
+            was_idle = self._idle
+            if jobs:
+                self._idle = False
+            return was_idle and bool(jobs)
+
+    def set_focus(self, visible_start, visible_end, playhead, level=None):
+        with self._lock:
+            window_changed = (visible_start != self.visible_start or
+                              visible_end != self.visible_end or
+                              level != self.focus_level)
+            self.visible_start = visible_start
+            self.visible_end = visible_end
+            self.playhead = playhead
+            self.focus_level = level
+
+            if window_changed:
+                # Nova janela: a métrica recomeça com os jobs visíveis ainda não prontos
+                self._visible_jobs = set()
+                self._focus_time = None
+                visible = list(self._running)
+                for (scrub, refine, job_level), queue in self._queues.items():
+                    if scrub or refine or (level is not None and job_level != level): continue
+                    visible.extend(queue.overlapping(visible_start, visible_end))
+                for job in visible:
+                    if self._is_visible(job):
+                        self._track_visible(job)
+
+    def set_hover(self, path):
+        """Clipe sob o mouse na faixa de vídeo (None = nenhum)."""
+        with self._lock:
+            self.hover_path = path
+
+    def mark_complete(self, path, level):
+        """Vídeo/nível pronto (gerado ou servido pelo cache): descarta o que ainda estiver pendente."""
+        with self._lock:
+            self._complete.add((path, level))
+            removed = list(self._by_video.get((path, level), {}).values())
+            for job in removed:
+                self._pop(job)
+            # O job em execução continua contando; a métrica fecha no job_done dele
+            self._visible_jobs -= {self._job_key(j) for j in removed}
+
+    def clear(self):
+        """Esvazia a fila (os workers devem ser parados pelo chamador)."""
+        with self._lock:
+            self._queues = {}
+            self._by_video = {}
+            self._pending_keys = {}
+            self._pending_count = 0
+            self._running = []
+            self._idle = True
+            self._known = set()
+            self._complete = set()
+            self._visible_jobs = set()
+            self._focus_time = None
+
+    def pending_count(self):
+        with self._lock:
+            return self._pending_count
+
+    # --- Consumidor (ThumbnailWorker) ---
+
+    def next_job(self, mark_idle=True):
+        """
+        Retira o job de maior prioridade; None se acabou.
+        mark_idle=False quando o consumidor ainda tem jobs em andamento e vai voltar a pedir.
+        """
+        with self._lock:
+            if not self._pending_count:
+                if mark_idle:
+                    self._idle = True
+                return None
+            hovered = self._by_video.get((self.hover_path, SCRUB_PREVIEW_LEVEL))
+            candidates = [j for j in hovered.values() if j.get('scrub')] if hovered else []
+            for queue in self._queues.values():
+                if queue:
+                    candidates.extend(queue.candidates(self.visible_start, self.visible_end, self.playhead))
+            job = min(candidates, key=self._priority)
+            self._pop(job)
+            self._running.append(job)
+            return job
+
+    def job_done(self, job):
+        """Marca o job como concluído. Retorna o tempo-até-visível (ms) quando o último job visível termina."""
+        with self._lock:
+            if job in self._running:
+                self._running.remove(job)
+
+            key = self._job_key(job)
+            if key not in self._visible_jobs:
+                return None
+            self._visible_jobs.discard(key)
+            if self._visible_jobs or self._focus_time is None:
+                return None
+
+            elapsed_ms = (time.monotonic() - self._focus_time) * 1000
+            self._focus_time = None
+            self.last_time_to_visible_ms = elapsed_ms
+            return elapsed_ms
+
+    # --- Internos (chamar com o lock adquirido) ---
+
+    @staticmethod
+    def _queue_key(job):
+        return (job.get('scrub', False), job.get('refine', False), job['level'])
+
+    def _push(self, job):
+        key = (job['start'], self._next_seq)
+        self._next_seq += 1
+        self._queues.setdefault(self._queue_key(job), _JobQueue()).add(key, job)
+        self._by_video.setdefault((job['path'], job['level']), {})[key] = job
+        self._pending_keys[id(job)] = key
+        self._pending_count += 1
+
+    def _pop(self, job):
+        key = self._pending_keys.pop(id(job), None)
+        if key is None: return
+        self._queues[self._queue_key(job)].remove(key)
+        video = self._by_video[(job['path'], job['level'])]
+        del video[key]
+        if not video:
+            del self._by_video[(job['path'], job['level'])]
+        self._pending_count -= 1
+
+    @staticmethod
+    def _dedupe_key(job):
+        # Sem o offset: o mesmo arquivo em duas posições da timeline é um só trabalho
+        return (job['path'], job['level'], job['first'], job.get('refine', False))
+
+    @staticmethod
+    def _job_key(job):
+        return (job['path'], job['level'], job['first'], job['start'], job.get('refine', False))
+
+    def _is_visible(self, job):
+        # A métrica mede a primeira faixa utilizável; refinamento e prévia do hover não contam
+        if job.get('refine') or job.get('scrub'):
+            return False
+        if self.focus_level is not None and job['level'] != self.focus_level:
+            return False
+        return job['end'] >= self.visible_start and job['start'] <= self.visible_end
+
+    def _track_visible(self, job):
+        if not self._visible_jobs:
+            self._focus_time = time.monotonic()
+        self._visible_jobs.add(self._job_key(job))
+
+    def _priority(self, job):
+        # Distância (s) do trecho do job até a janela visível e até a agulha
+        to_window = max(self.visible_start - job['end'], job['start'] - self.visible_end, 0.0)
+        to_playhead = max(self.playhead - job['end'], job['start'] - self.playhead, 0.0)
+        other_level = self.focus_level is not None and job['level'] != self.focus_level
+        scrub = job.get('scrub', False)
+        hovered = scrub and job['path'] == self.hover_path
+        # Prévia densa do clipe sob o mouse antes de tudo; a dos outros clipes por último e
+        # refinamentos só depois de todas as prévias; depois o nível do zoom atual; dentro
+        # dele, o que está na tela e depois o mais perto
+        return (not hovered, scrub, job.get('refine', False), other_level, to_window > 0, min(to_window, to_playhead), job['start'])
@@ -1,67 +1,507 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
 import cv2
+import numpy as np
 from PySide6.QtCore import QThread, Signal
 from PySide6.QtGui import QImage
-from src.config import THUMBNAIL_HEIGHT, THUMBNAIL_INTERVAL_SECONDS
+from src.config import (
+    THUMBNAIL_HEIGHT,
+    THUMBNAIL_DEFAULT_GOP_SECONDS, THUMBNAIL_GOP_PROBE_PACKETS,
+    THUMBNAIL_SEEK_COST_FRAMES,
+    THUMBNAIL_PROCESS_WORKERS, THUMBNAIL_JPEG_QUALITY,
+    THUMBNAIL_BATCH_INTERVAL_MS
+)
+from src.core.keyframe_index import (
+    scan_keyframes, load_index, load_or_build_index, seek_exact, default_index_dir,
+    OPENCV_SEEK_BACKOFF_FRAMES
+)
+
+MODE_SEEK = "seek"
+MODE_SEQUENTIAL = "sequencial"
+MODE_KEYFRAME = "keyframe" # Prévia rápida: quadro mais barato perto de cada amostra (logo após um keyframe)
+
+
+def probe_gop_seconds(path, fps, index_dir=None):
+    """
+    Espaçamento médio entre keyframes: do índice gravado na importação ou, sem ele,
+    lendo pacotes sem decodificar (modo raw do backend FFmpeg). Retorna None se o backend não suportar.
+    """
+    index = load_index(path, index_dir)
+    if index is not None:
+        return index.gop_seconds()
+
+    scan = scan_keyframes(path, THUMBNAIL_GOP_PROBE_PACKETS)
+    if scan is None:
+        return None
+    keyframes, packet = scan
+
+    if len(keyframes) < 2:
+        # Um único keyframe nos pacotes lidos: GOP pelo menos desse tamanho
+        return packet / fps if packet > 0 else None
+
+    avg_gop_frames = (keyframes[-1] - keyframes[0]) / (len(keyframes) - 1)
+    return avg_gop_frames / fps
+
+
+def choose_extraction_mode(fps, interval_seconds, gop_seconds):
+    """
+    Escolhe entre seek por thumbnail e decodificação sequencial.
+    Compara o custo aproximado (em quadros decodificados) por thumbnail:
+    - seek: volta ao keyframe anterior e decodifica, em média, meio GOP
+    - sequencial: decodifica todos os quadros do intervalo com grab()
+    """
+    interval_frames = interval_seconds * fps
+    seek_frames = (gop_seconds * fps) / 2 + THUMBNAIL_SEEK_COST_FRAMES
+    return MODE_SEQUENTIAL if interval_frames <= seek_frames else MODE_SEEK
+
+
+def default_process_workers():
+    """Número de processos do pool: THUMBNAIL_PROCESS_WORKERS ou núcleos - 1 (um fica para a UI/player)."""
+    if THUMBNAIL_PROCESS_WORKERS > 0:
+        return THUMBNAIL_PROCESS_WORKERS
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+def create_process_pool(workers=None):
+    """
+    Pool de processos dos thumbnails, ou None quando há um único processo (decodifica na thread).
+    Criado uma vez pelo editor e reaproveitado por todas as gerações: com "spawn" cada
+    processo novo reimporta a aplicação inteira, caro demais para cada nível/hover.
+    "spawn" porque fazer fork de um processo com threads do Qt rodando (UI, FrameServer,
+    importação) não é seguro; os processos começam limpos.
+    """
+    workers = workers or default_process_workers()
+    if workers <= 1:
+        return None
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def thumbnail_size(frame, target_height=THUMBNAIL_HEIGHT):
+    h, w = frame.shape[:2]
+    # Largura múltipla de 4 para que bytesPerLine == 3 * largura (sem padding)
+    return max(4, int(w * target_height / h) // 4 * 4), target_height
+
+
+def frame_to_qimage(frame, target_height=THUMBNAIL_HEIGHT):
+    """
+    Redimensiona o quadro BGR direto para dentro do buffer de um QImage BGR888.
+    Evita o cvtColor e o copy() extra: o QImage é dono da memória desde o início.
+    """
+    new_w, new_h = thumbnail_size(frame, target_height)
+
+    q_img = QImage(new_w, new_h, QImage.Format_BGR888)
+    dst = np.ndarray((new_h, new_w, 3), dtype=np.uint8, buffer=q_img.bits())
+    cv2.resize(frame, (new_w, new_h), dst=dst, interpolation=cv2.INTER_AREA)
+    return q_img
+
+
+def frame_to_jpeg(frame, target_height=THUMBNAIL_HEIGHT):
+    """Thumbnail como buffer JPEG (bytes): formato compacto para voltar dos processos do pool."""
+    new_w, new_h = thumbnail_size(frame, target_height)
+    small = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_AREA)
+    ok, buf = cv2.imencode(".jpg", small, [cv2.IMWRITE_JPEG_QUALITY, THUMBNAIL_JPEG_QUALITY])
+    return buf.tobytes() if ok else None
+
+
+class FrameExtractor:
+    """
+    Extrai os quadros de um job (trecho de vídeo num nível da pirâmide).
+    Mantém o VideoCapture aberto entre jobs do mesmo arquivo e escolhe, por vídeo/nível,
+    entre seek por thumbnail e decodificação sequencial.
+    Usado tanto na thread do ThumbnailWorker quanto nos processos do pool.
+    """
+
+    def __init__(self, mode=None, index_dir=None):
+        # None = automático (por vídeo/nível); MODE_SEEK / MODE_SEQUENTIAL forçam o modo
+        self.mode = mode
+        # Diretório dos índices de keyframes (processos do pool não têm o nome do app do Qt)
+        self.index_dir = index_dir
+        self._modes = {}     # (path, level) -> modo escolhido
+        self._indexes = {}   # path -> KeyframeIndex (None = sem índice / backend sem modo raw)
+        self._cap = None
+        self._cap_path = None
+        self._cap_fps = 30
+        self._cap_frame = None # Próximo quadro que um grab() devolveria (None = desconhecido)
+
+    def extract(self, job, should_continue=lambda: True):
+        """Gera (índice, quadro BGR) para os thumbnails do job."""
+        path, level = job['path'], job['level']
+        if not self._open(path):
+            return
+
+        key = (path, level)
+        mode = job.get('mode') or self.mode or self._modes.get(key)
+        if mode is None:
+            gop_seconds = probe_gop_seconds(path, self._cap_fps, self.index_dir) or THUMBNAIL_DEFAULT_GOP_SECONDS
+            mode = choose_extraction_mode(self._cap_fps, level, gop_seconds)
+            self._modes[key] = mode
+
+        if mode == MODE_KEYFRAME:
+            yield from self._extract_keyframes(job, should_continue)
+        elif mode == MODE_SEQUENTIAL:
+            yield from self._extract_sequential(job, should_continue)
+        else:
+            yield from self._extract_seek(job, should_continue)
+
+    def release(self):
+        if self._cap is not None:
+            self._cap.release()
+        self._cap = None
+        self._cap_path = None
+        self._cap_frame = None
+
+    def _open(self, path):
+        if self._cap_path == path and self._cap is not None:
+            return True
+        self.release()
+
+        cap = cv2.VideoCapture(path)
+        if not cap.isOpened():
+            return False
+
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        self._cap = cap
+        self._cap_path = path
+        self._cap_fps = fps if fps > 0 else 30 # Fallback
+        self._cap_frame = 0
+        if path not in self._indexes:
+            self._indexes[path] = load_index(path, self.index_dir) # Gravado na importação; não varre o arquivo aqui
+        return True
+
+    def _extract_seek(self, job, should_continue):
+        index = self._indexes.get(job['path'])
+        if index is not None:
+            yield from self._extract_indexed(job, index, should_continue)
+            return
+
+        cap, level = self._cap, job['level']
+        duration = job['video'].get('duracao', 0)
+        self._cap_frame = None # Posição depois de seeks não é rastreada
+
+        for idx in range(job['first'], job['last'] + 1):
+            if not should_continue(): return
+            time_pos = idx * level
+            if time_pos >= duration: return
+
+            # Set position
+            cap.set(cv2.CAP_PROP_POS_MSEC, time_pos * 1000)
+            ret, frame = cap.read()
+
+            if ret:
+                yield idx, frame
+
+    def _extract_indexed(self, job, index, should_continue):
+        # Quadro exato pelo PTS; entre amostras, decodifica para frente quando sai
+        # mais barato que o seek (o índice sabe onde cai cada GOP)
+        cap, level = self._cap, job['level']
+        duration = job['video'].get('duracao', 0)
+
+        for idx in range(job['first'], job['last'] + 1):
+            if not should_continue(): return
+            time_pos = idx * level
+            if time_pos >= duration: return
+
+            target = index.frame_at_time(time_pos)
+            seek_exact(cap, target, self._cap_frame, index)
+            ret, frame = cap.read()
+            self._cap_frame = target + 1 if ret else None
+
+            if ret:
+                yield idx, frame
+
+    def _extract_keyframes(self, job, should_continue):
+        # O seek do OpenCV recomeça no keyframe antes de (alvo - 16) e decodifica até o
+        # alvo: pedir o quadro K + 16 de um keyframe K custa só os 17 quadros a partir
+        # de K, qualquer que seja o GOP. Cada amostra usa esse quadro do keyframe mais
+        # próximo (ou o quadro exato, se não custar mais); amostras que caem no mesmo
+        # quadro reaproveitam a decodificação.
+        index = self._indexes.get(job['path'])
+        if index is None or not len(index.keyframes):
+            # Sem índice (backend sem modo raw): cai no seek exato
+            yield from self._extract_seek(job, should_continue)
+            return
+
+        cap, level = self._cap, job['level']
+        duration = job['video'].get('duracao', 0)
+        keyframes = index.keyframes
+        last_target, last_frame = None, None
+
+        for idx in range(job['first'], job['last'] + 1):
+            if not should_continue(): return
+            time_pos = idx * level
+            if time_pos >= duration: return
+
+            exact = index.frame_at_time(time_pos)
+            pos = int(np.searchsorted(keyframes, exact))
+            candidates = [min(int(k) + OPENCV_SEEK_BACKOFF_FRAMES, index.frame_count - 1)
+                          for k in keyframes[max(0, pos - 1):pos + 1]]
+            preview = min(candidates, key=lambda f: abs(f - exact))
+            target = exact if index.seek_cost(exact) <= index.seek_cost(preview) else preview
+
+            if target != last_target:
+                seek_exact(cap, target, self._cap_frame, index)
+                ret, frame = cap.read()
+                self._cap_frame = target + 1 if ret else None
+                last_target, last_frame = target, (frame if ret else None)
+
+            if last_frame is not None:
+                yield idx, last_frame
+
+    def _extract_sequential(self, job, should_continue):
+        # Decodifica para frente uma única vez; grab() avança sem converter o quadro
+        # e retrieve() só é chamado nos quadros que viram thumbnail.
+        cap, level, fps = self._cap, job['level'], self._cap_fps
+
+        first_frame = int(round(job['first'] * level * fps))
+        if self._cap_frame is None or self._cap_frame > first_frame:
+            # Trecho fora de ordem: um seek para o início dele e segue sequencial
+            cap.set(cv2.CAP_PROP_POS_FRAMES, first_frame)
+            self._cap_frame = first_frame
+
+        for idx in range(job['first'], job['last'] + 1):
+            if not should_continue(): return
+            target_frame = int(round(idx * level * fps))
+
+            while self._cap_frame < target_frame:
+                if not cap.grab() or not should_continue(): return
+                self._cap_frame += 1
+
+            if not cap.grab(): return
+            self._cap_frame += 1
+
+            ret, frame = cap.retrieve()
+            if ret:
+                yield idx, frame
+
+
+# Extrator de cada processo do pool (reaproveita o VideoCapture entre jobs do mesmo vídeo)
+_process_extractor = None
+
+
+def extract_job_encoded(job, mode=None, index_dir=None):
+    """Executado nos processos do pool: devolve [(índice, bytes JPEG), ...] do job."""
+    global _process_extractor
+    if _process_extractor is None:
+        _process_extractor = FrameExtractor()
+    _process_extractor.mode = mode
+    _process_extractor.index_dir = index_dir
+
+    results = []
+    for idx, frame in _process_extractor.extract(job):
+        data = frame_to_jpeg(frame, job.get('height', THUMBNAIL_HEIGHT))
+        if data is not None:
+            results.append((idx, data))
+    return results
+
 
 class ThumbnailWorker(QThread):
-    # video_path, index, image, video_id (optional, using path for now)
-    thumbnail_generated = Signal(str, int, QImage)
+    """
+    Consome os jobs de um ThumbnailScheduler (trechos de vídeo por nível da pirâmide),
+    sempre pegando o mais próximo da área visível da timeline.
+    Com um pool (create_process_pool, de vida longa e do dono do worker), os jobs são
+    distribuídos entre os processos; sem ele, decodifica na própria thread.
+    Os thumbnails sempre saem como buffers JPEG (bytes), codificados aqui ou nos
+    processos: a timeline só decodifica pixmaps quando eles vão para a tela.
+    """
+    # Lote de (video_path, level, index, bytes JPEG).
+    # Um sinal por lote (no máximo a cada THUMBNAIL_BATCH_INTERVAL_MS) em vez de um por thumbnail.
+    thumbnails_generated = Signal(list)
+    # Tempo (ms) até os thumbnails da janela visível ficarem prontos
+    visible_thumbnails_ready = Signal(float)
     finished = Signal()
 
-    def __init__(self, videos_data):
+    def __init__(self, scheduler, mode=None, cache=None, pool=None, process_workers=None):
         super().__init__()
-        self.videos_data = videos_data
+        self.scheduler = scheduler
         self.is_running = True
+        self.mode = mode
+        # ThumbnailCache opcional (src.core.thumbnail_cache)
+        self.cache = cache
+        self.pool = pool
+        self.process_workers = process_workers or default_process_workers()
+
+        self._progress = {}  # (path, level, refine) -> {'images': [...], 'done': n, 'final': bool}
+        self._resumed = {}   # (path, level) -> thumbnails vindos do cache (parcial) ou []
+        self.index_dir = default_index_dir()
+        self._indexed = set() # Vídeos com o índice de keyframes garantido em disco
+        self._extractor = FrameExtractor(mode, self.index_dir)
+        self._batch = []
+        self._batch_started = 0.0
 
     def run(self):
-        for video in self.videos_data:
-            if not self.is_running: break
-            
-            path = video['caminho']
-            duration = video.get('duracao', 0)
-            
-            cap = cv2.VideoCapture(path)
-            if not cap.isOpened():
-                continue
-
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            if fps <= 0: fps = 30 # Fallback
-
-            time_pos = 0.0
-            idx = 0
-            
-            while time_pos < duration and self.is_running:
-                # Set position
-                cap.set(cv2.CAP_PROP_POS_MSEC, time_pos * 1000)
-                ret, frame = cap.read()
-                
-                if ret:
-                    # Resize mantendo aspect ratio ou fixando altura? 
-                    # Fixando altura conforme config
-                    h, w, c = frame.shape
-                    new_h = THUMBNAIL_HEIGHT
-                    scale = new_h / h
-                    new_w = int(w * scale)
-                    
-                    frame_resized = cv2.resize(frame, (new_w, new_h))
-                    
-                    # Converter para RGB (QImage usa RGB, OpenCV usa BGR)
-                    frame_rgb = cv2.cvtColor(frame_resized, cv2.COLOR_BGR2RGB)
-                    
-                    height, width, channel = frame_rgb.shape
-                    bytes_per_line = 3 * width
-                    q_img = QImage(frame_rgb.data, width, height, bytes_per_line, QImage.Format_RGB888)
-                    
-                    # Faz uma cópia para evitar problemas de memória com buffer do opencv
-                    self.thumbnail_generated.emit(path, idx, q_img.copy())
-                
-                time_pos += THUMBNAIL_INTERVAL_SECONDS
-                idx += 1
-                
-            cap.release()
-            
+        if self.pool is not None:
+            self._run_pool()
+        if self.pool is None and self.is_running:
+            self._run_in_thread() # Sem pool (ou o pool quebrou no meio)
+
+        self._flush_batch()
+
+        if not self.is_running:
+            self._store_partial()
+
+        if self.cache is not None:
+            self.cache.flush() # Persiste os last_access atualizados (LRU)
+            stats = self.cache.stats()
+            print(f"Cache de thumbnails: {stats['hits']} hits / {stats['partial_hits']} parciais / "
+                  f"{stats['misses']} misses")
+
         self.finished.emit()
 
+    def _run_in_thread(self):
+        while self.is_running:
+            job = self.scheduler.next_job()
+            if job is None: break
+
+            if not self._start_job(job):
+                self._extract_in_thread(job)
+            self._finish_job(job)
+
+        self._extractor.release()
+
+    def _extract_in_thread(self, job):
+        for idx, frame in self._extractor.extract(job, lambda: self.is_running):
+            data = frame_to_jpeg(frame, job.get('height', THUMBNAIL_HEIGHT))
+            if data is not None:
+                self._emit_thumbnail(job, idx, data)
+
+    def _run_pool(self):
+        in_flight = {}
+        try:
+            while self.is_running:
+                # Mantém o pool cheio, mas com poucos jobs na fila para que a
+                # prioridade (área visível) continue valendo a cada submissão
+                while self.pool is not None and len(in_flight) < self.process_workers * 2 and self.is_running:
+                    job = self.scheduler.next_job(mark_idle=not in_flight)
+                    if job is None: break
+                    if self._start_job(job):
+                        self._finish_job(job)
+                        continue
+                    try:
+                        in_flight[self.pool.submit(extract_job_encoded, job, self.mode, self.index_dir)] = job
+                    except (BrokenProcessPool, RuntimeError) as e:
+                        # Processo do pool morreu (ou o pool foi encerrado): segue na thread
+                        print(f"Pool de thumbnails indisponível, decodificando na thread: {e}")
+                        self.pool = None
+                        self._extract_in_thread(job)
+                        self._finish_job(job)
+                        break
+
+                if not in_flight: break
+
+                done, _ = wait(list(in_flight), timeout=0.1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = in_flight.pop(future)
+                    try:
+                        results = future.result()
+                    except Exception as e:
+                        print(f"Erro ao gerar thumbnails de {job['path']}: {e}")
+                        results = []
+                    if not self.is_running: break
+                    for idx, data in results:
+                        self._emit_thumbnail(job, idx, data)
+                    self._finish_job(job)
+        finally:
+            # Cancelamento: descarta o que ainda não começou; o pool continua vivo
+            for future in in_flight:
+                future.cancel()
+
+    def _start_job(self, job):
+        """
+        Prepara o job; retorna True se não há nada a decodificar: o vídeo/nível veio
+        completo do cache ou o trecho já estava pronto numa geração anterior interrompida.
+        """
+        path, level = job['path'], job['level']
+        video_key = (path, level)
+
+        if video_key not in self._resumed:
+            # Primeiro trecho deste vídeo/nível: consulta o cache uma única vez
+            cached = self.cache.load(path, level) if self.cache is not None else None
+            images, complete = cached if cached else ([], False)
+            batch = [(path, level, idx, img) for idx, img in enumerate(images) if img is not None]
+            if batch:
+                self.thumbnails_generated.emit(batch)
+            if complete:
+                self.scheduler.mark_complete(path, level)
+                return True
+            # Parcial (ou miss): retoma a partir do que já foi gerado
+            self._resumed[video_key] = images
+            if path not in self._indexed:
+                # Projeto antigo (sem índice da importação): varre o arquivo uma vez
+                # aqui, antes dos trechos irem para o pool, e não em cada processo
+                load_or_build_index(path, self.index_dir)
+                self._indexed.add(path)
+
+        key = self._progress_key(job)
+        if key not in self._progress:
+            self._progress[key] = {
+                'images': list(self._resumed[video_key]),
+                'done': 0,
+                'final': job.get('final', True),
+            }
+
+        images = self._progress[key]['images']
+        last = min(job['last'], len(images) - 1)
+        covered = last == job['last'] and all(images[i] is not None for i in range(job['first'], last + 1))
+        return covered
+
+    def _finish_job(self, job):
+        # Entrega o que o job gerou antes de medir o tempo-até-visível
+        self._flush_batch()
+
+        elapsed_ms = self.scheduler.job_done(job)
+        if elapsed_ms is not None:
+            self.visible_thumbnails_ready.emit(elapsed_ms)
+
+        key = self._progress_key(job)
+        progress = self._progress.get(key)
+        if progress is None: return
+
+        progress['done'] += 1
+        # Só grava vídeos completos (um stop() no meio é gravado como parcial em _store_partial)
+        # e só o passe final (a prévia por keyframes é substituída pelo refinamento)
+        if progress['done'] >= job['chunks'] and self.is_running:
+            if progress['final']:
+                if self.cache is not None:
+                    self.cache.store(job['path'], job['level'], progress['images'])
+                self.scheduler.mark_complete(job['path'], job['level'])
+            del self._progress[key]
+
+    def _store_partial(self):
+        """Interrompido: grava o que o passe final já gerou para retomar na próxima abertura."""
+        if self.cache is None: return
+        for (path, level, refine), progress in self._progress.items():
+            if progress['final'] and any(img is not None for img in progress['images']):
+                self.cache.store(path, level, progress['images'], complete=False)
+        self._progress = {}
+
+    @staticmethod
+    def _progress_key(job):
+        # Prévia e refinamento são acompanhados separadamente
+        return (job['path'], job['level'], job.get('refine', False))
+
+    def _emit_thumbnail(self, job, idx, image):
+        # Lista posicional para o cache (None = quadro que falhou)
+        images = self._progress[self._progress_key(job)]['images']
+        images.extend([None] * (idx + 1 - len(images)))
+        images[idx] = image
+        self._queue_thumbnail(job['path'], job['level'], idx, image)
+
+    def _queue_thumbnail(self, path, level, idx, image):
+        if not self._batch:
+            self._batch_started = time.monotonic()
+        self._batch.append((path, level, idx, image))
+        if (time.monotonic() - self._batch_started) * 1000 >= THUMBNAIL_BATCH_INTERVAL_MS:
+            self._flush_batch()
+
+    def _flush_batch(self):
+        if self._batch:
+            batch, self._batch = self._batch, []
+            self.thumbnails_generated.emit(batch)
+
     def stop(self):
         self.is_running = False
         self.wait()
@@ -2,6 +2,7 @@ import os
 import cv2
 import uuid
 from PySide6.QtCore import QThread, Signal
+from src.core.keyframe_index import load_or_build_index
 
 class VideoImportWorker(QThread):
     """
@@ -38,6 +39,12 @@ class VideoImportWorker(QThread):
                 cap.release()
                 
                 size_bytes = os.path.getsize(file_path)
+
+                # Índice de keyframes/PTS gravado ao lado do cache: seeks exatos (thumbnails,
+                # quadro a quadro) vão direto ao GOP certo sem varrer o arquivo de novo
+                keyframe_index = load_or_build_index(file_path)
+                if keyframe_index is None:
+                    print(f"Índice de keyframes indisponível para {file_path}")
                 
                 # Criar Objeto de Dados
                 video_item = {